@@ -3,111 +3,105 @@ import os
 import time
 import pandas as pd
 import traceback
-from selenium import webdriver
+from concurrent.futures import ThreadPoolExecutor
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
+from driver_pool import DriverPool
+from bse_client import ResultsClient, NoResultsError
+from xbrl_http import grid_rows, xbrl_links, STANDALONE_XBRL_COLUMN, CONSOLIDATED_XBRL_COLUMN
+from fetch_engine import run_downloads
+from download_manifest import DownloadManifest
+from run_journal import RunJournal
 
 # Chrome options
 options = Options()
 options.add_argument("--start-maximized")
 options.add_argument("--headless")  # Comment this line to see browser interactions
 
-# Initialize a list to hold log data
-log_data = []
+# Number of warm browsers (and companies processed in parallel), and how many companies
+# a browser serves before it is restarted to release memory
+DRIVER_POOL_SIZE = 4
+MAX_JOBS_PER_DRIVER = 25
 
-def log_message(symbol, file_name, url, status, error_line=None):
-    log_data.append({
+# "http" replays the company search as plain form posts and downloads the XBRL files with the
+# asyncio fetch engine, with no browser at all; "selenium" drives the search page
+BACKEND = "selenium"
+HTTP_WORKERS = 16
+
+# Report types collected from each company's results grid. The grid is loaded once for all of
+# them; listing both fetches standalone and consolidated filings in one pass, each into its own
+# sub-folder of the output path
+REPORT_TYPES = ["Standalone"]
+XBRL_COLUMNS = {"Standalone": STANDALONE_XBRL_COLUMN, "Consolidated": CONSOLIDATED_XBRL_COLUMN}
+
+# Request-rate budget for the http downloads: files in flight and requests per second per host
+DOWNLOAD_CONCURRENCY = 8
+REQUESTS_PER_SECOND_PER_HOST = 2.0
+
+# Filings already saved are recorded here and skipped on later runs
+MANIFEST_PATH = r"D:\FinancialStatementAnalysis\01ETL\download_manifest.sqlite"
+
+# Log entries are appended to this journal as they happen and exported to the Excel log at the end
+base_log_path = r"D:\FinancialStatementAnalysis\04log"
+log_file_name = "log_results_for_period_1_to_6.xlsx"
+LOG_COLUMNS = ["Symbol", "File Name", "URL", "Status", "Error Line", "Seconds"]
+journal = RunJournal(os.path.join(base_log_path, log_file_name.replace(".xlsx", ".jsonl")))
+
+# (security code, report type, period, (symbol, file name, url, file path)) of the files found in http mode,
+# downloaded once all lookups are done
+pending_downloads = []
+
+def log_message(symbol, file_name, url, status, error_line=None, seconds=None):
+    journal.record({
         "Symbol": symbol,
         "File Name": file_name,
         "URL": url,
         "Status": status,
-        "Error Line": error_line
+        "Error Line": error_line,
+        "Seconds": seconds  # Time spent downloading the file, when one was downloaded
     })
 
-def XML_extraction(security_code, symbol, start_period, end_period, save_folder):
+def XML_extraction(security_code, symbol, start_period, end_period, save_folders):
     Top_URL = "https://www.bseindia.com/corporates/Comp_Resultsnew.aspx"
 
+    if BACKEND == "http":
+        return XML_extraction_http(Top_URL, security_code, symbol, start_period, end_period, save_folders)
+
     for attempt in range(3):  # Retry mechanism: try up to 3 times
         try:
-            driver = webdriver.Chrome(options=options)
-            driver.get(Top_URL)
-            print(f"Processing: {symbol}")
+            with driver_pool.lease() as driver:
+                driver.get(Top_URL)
+                print(f"Processing: {symbol}")
 
-            # Locate and input security code
-            Security_Search = WebDriverWait(driver, 10).until(
-                EC.visibility_of_element_located((By.ID, "ContentPlaceHolder1_SmartSearch_smartSearch"))
-            )
-            Security_Search.clear()
-            Security_Search.send_keys(security_code)
-
-            li_element = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, f"//li[contains(@onclick, \"'{security_code}'\")]"))
-            )
-            li_element.click()
-
-            dropdown = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "ContentPlaceHolder1_broadcastdd"))
-            )
-            select = Select(dropdown)
-            select.select_by_value("7")
-
-            Submit_button = driver.find_element(By.ID, "ContentPlaceHolder1_btnSubmit")
-            Submit_button.click()
-
-            rows = WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located(
-                    (By.XPATH, f"//td[contains(text(), '{security_code}')]/following-sibling::td[3]")
+                # Locate and input security code
+                Security_Search = WebDriverWait(driver, 10).until(
+                    EC.visibility_of_element_located((By.ID, "ContentPlaceHolder1_SmartSearch_smartSearch"))
                 )
-            )
-            download_links = driver.find_elements(
-                By.XPATH, f"//td[contains(text(), '{security_code}')]/following-sibling::td[5]//a"
-            )
-
-            # Flags to control range-based downloading
-            found_start = False
-            for i in range(len(rows)):
-                period_text = rows[i].text
-                link = download_links[i]
-
-                # Start downloading when Start Period is found
-                if period_text == start_period:
-                    found_start = True
-
-                # Download files while in the range of Start Period and End Period
-                if found_start:
-                    link.click()
-                    driver.switch_to.window(driver.window_handles[-1])
-                    current_url = driver.current_url
-                    # Format the file name as Symbol_Period.xml
-                    custom_file_name = f"{symbol}_{period_text}.xml"
-                    custom_file_path = os.path.join(save_folder, custom_file_name)
-
-                    try:
-                        xml_div = WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.ID, 'webkit-xml-viewer-source-xml'))
-                        )
-                        xml_content = xml_div.get_attribute('innerHTML')
-                        with open(custom_file_path, 'w', encoding='utf-8') as file:
-                            file.write(xml_content)
-                        print(f"File saved: {custom_file_name}")
-                        log_message(symbol, custom_file_name, current_url, "Success")
-
-                    except Exception as e:
-                        error_msg = traceback.format_exc()
-                        log_message(symbol, custom_file_name, current_url, "File not saved", error_msg)
-                        print(f"Error saving file: {e}")
-
-                    driver.close()
-                    driver.switch_to.window(driver.window_handles[0]) 
-
-                # Stop downloading when End Period is reached
-                if period_text == end_period:
-                    break
-
-            driver.quit()
+                Security_Search.clear()
+                Security_Search.send_keys(security_code)
+
+                li_element = WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.XPATH, f"//li[contains(@onclick, \"'{security_code}'\")]"))
+                )
+                li_element.click()
+
+                dropdown = WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.ID, "ContentPlaceHolder1_broadcastdd"))
+                )
+                select = Select(dropdown)
+                select.select_by_value("7")
+
+                Submit_button = driver.find_element(By.ID, "ContentPlaceHolder1_btnSubmit")
+                Submit_button.click()
+
+                for report_type in REPORT_TYPES:
+                    save_period_xmls(
+                        driver, security_code, symbol, start_period, end_period, report_type, save_folders[report_type]
+                    )
+
             return  # Exit function if successful
 
         except Exception as e:
@@ -117,11 +111,122 @@ def XML_extraction(security_code, symbol, start_period, end_period, save_folder)
             if attempt == 2:  # Log final failure after 3 attempts
                 log_message(symbol, "N/A", Top_URL, "Extraction Failed", error_msg)
 
-        finally:
+def save_period_xmls(driver, security_code, symbol, start_period, end_period, report_type, save_folder):
+    """Save the XBRL files of one report type between the start and end periods of the loaded grid."""
+    rows = WebDriverWait(driver, 10).until(
+        EC.presence_of_all_elements_located(
+            (By.XPATH, f"//td[contains(text(), '{security_code}')]/following-sibling::td[3]")
+        )
+    )
+    download_links = driver.find_elements(
+        By.XPATH, f"//td[contains(text(), '{security_code}')]/following-sibling::td[{XBRL_COLUMNS[report_type]}]//a"
+    )
+
+    # Flags to control range-based downloading
+    found_start = False
+    for i in range(len(rows)):
+        period_text = rows[i].text
+        link = download_links[i]
+
+        # Start downloading when Start Period is found
+        if period_text == start_period:
+            found_start = True
+
+        # Download files while in the range of Start Period and End Period,
+        # skipping the ones an earlier run already saved
+        link_url = link.get_attribute('href') if found_start else None
+        if found_start and manifest.is_fetched(security_code, report_type, period_text, link_url):
+            print(f"Already downloaded: {symbol}_{period_text}.xml")
+            log_message(symbol, f"{symbol}_{period_text}.xml", link_url, "Already downloaded")
+        elif found_start:
+            started = time.perf_counter()
+            link.click()
+            driver.switch_to.window(driver.window_handles[-1])
+            current_url = driver.current_url
+            # Format the file name as Symbol_Period.xml
+            custom_file_name = f"{symbol}_{period_text}.xml"
+            custom_file_path = os.path.join(save_folder, custom_file_name)
+
             try:
-                driver.quit()
-            except:
-                pass  # Ignore if driver already quit
+                xml_div = WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.ID, 'webkit-xml-viewer-source-xml'))
+                )
+                xml_content = xml_div.get_attribute('innerHTML')
+                with open(custom_file_path, 'w', encoding='utf-8') as file:
+                    file.write(xml_content)
+                if manifest.record(security_code, report_type, period_text, link_url, custom_file_path):
+                    print(f"File saved: {custom_file_name}")
+                    log_message(symbol, custom_file_name, current_url, "Success", seconds=round(time.perf_counter() - started, 3))
+                else:
+                    log_message(symbol, custom_file_name, current_url, "Not XBRL", seconds=round(time.perf_counter() - started, 3))
+
+            except Exception as e:
+                error_msg = traceback.format_exc()
+                log_message(symbol, custom_file_name, current_url, "File not saved", error_msg, round(time.perf_counter() - started, 3))
+                print(f"Error saving file: {e}")
+
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0]) 
+
+        # Stop downloading when End Period is reached
+        if period_text == end_period:
+            break
+
+def XML_extraction_http(Top_URL, security_code, symbol, start_period, end_period, save_folders):
+    for attempt in range(3):  # Retry mechanism: try up to 3 times
+        try:
+            print(f"Processing: {symbol}")
+            page_source, page_url = results_client.lookup(security_code)
+            break
+        except NoResultsError as e:
+            # The search post was ignored or the company has no results; retrying will not help
+            print(f"No results returned for {symbol}: {e}")
+            log_message(symbol, "N/A", Top_URL, "No results for security code", str(e))
+            return
+        except Exception as e:
+            error_msg = traceback.format_exc()
+            print(f"Error occurred for {symbol}, attempt {attempt + 1}: {e}")
+
+            if attempt == 2:  # Log final failure after 3 attempts
+                log_message(symbol, "N/A", Top_URL, "Extraction Failed", error_msg)
+                return
+
+    rows = grid_rows(page_source, page_url)  # Parsed once for every report type
+
+    for report_type in REPORT_TYPES:
+        # Flags to control range-based downloading
+        found_start = False
+        for period_text, xml_url in xbrl_links(rows, security_code, XBRL_COLUMNS[report_type]):
+            # Start downloading when Start Period is found
+            if period_text == start_period:
+                found_start = True
+
+            # Download files while in the range of Start Period and End Period
+            if found_start:
+                # Format the file name as Symbol_Period.xml
+                custom_file_name = f"{symbol}_{period_text}.xml"
+                custom_file_path = os.path.join(save_folders[report_type], custom_file_name)
+
+                if xml_url is None:
+                    log_message(symbol, custom_file_name, page_url, "No XML link found")
+                elif manifest.is_fetched(security_code, report_type, period_text, xml_url):
+                    print(f"Already downloaded: {custom_file_name}")
+                    log_message(symbol, custom_file_name, xml_url, "Already downloaded")
+                else:
+                    pending_downloads.append(
+                        (security_code, report_type, period_text, (symbol, custom_file_name, xml_url, custom_file_path))
+                    )
+
+            # Stop downloading when End Period is reached
+            if period_text == end_period:
+                break
+
+def extract_company(security_code, symbol, start_period, end_period, Save_Folders):
+    try:
+        XML_extraction(security_code, symbol, start_period, end_period, Save_Folders)
+    except Exception as e:
+        error_msg = traceback.format_exc()
+        log_message(symbol, "N/A", "N/A", "Extraction Failed", error_msg)
 
 # Updated file path
 file_path = r"D:\FinancialStatementAnalysis\03input\Taxomy_LOS_For_Period 1_6.xlsx"  # Update to new file
@@ -144,31 +249,63 @@ if 'Start Period' not in df.columns or 'End Period' not in df.columns:
 # Base path for saving XML files
 base_path = r"D:\FinancialStatementAnalysis\01ETL\extracted"
 
-# Loop through each company in the DataFrame
-for index, row in df.iterrows():
-    sr_no = row['Sr No']
-    symbol = row['Symbol']  # Changed from company_name to symbol
-    security_code = row['Security Code']
-    # Adjust for swapped Start and End Period
-    start_period = row['End Period']  # 'End Period' now contains Start Period data
-    end_period = row['Start Period']  # 'Start Period' now contains End Period data
-
-    folder_name = f"{sr_no}_{symbol}"  # Use symbol instead of company name
-    Save_Folder = os.path.join(base_path, folder_name)
-    os.makedirs(Save_Folder, exist_ok=True)
-
-    try:
-        XML_extraction(security_code, symbol, start_period, end_period, Save_Folder)
-    except Exception as e:
-        error_msg = traceback.format_exc()
-        log_message(symbol, "N/A", "N/A", "Extraction Failed", error_msg)
-
-# Save the log data to an Excel file
-base_log_path = r"D:\FinancialStatementAnalysis\04log"
-os.makedirs(base_log_path, exist_ok=True)
-
-log_file_name = "log_results_for_period_1_to_6.xlsx"
-log_df = pd.DataFrame(log_data, columns=["Symbol", "File Name", "URL", "Status", "Error Line"])
-log_df.to_excel(os.path.join(base_log_path, log_file_name), index=False)
+manifest = DownloadManifest(MANIFEST_PATH)
+
+# Start the warm browsers shared by all companies, or the form-post client when no browser is used
+driver_pool = None
+results_client = None
+if BACKEND == "http":
+    results_client = ResultsClient()
+    workers = HTTP_WORKERS
+else:
+    driver_pool = DriverPool(options, size=DRIVER_POOL_SIZE, max_jobs_per_driver=MAX_JOBS_PER_DRIVER)
+    workers = DRIVER_POOL_SIZE
+
+try:
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        # Loop through each company in the DataFrame
+        for index, row in df.iterrows():
+            sr_no = row['Sr No']
+            symbol = row['Symbol']  # Changed from company_name to symbol
+            security_code = row['Security Code']
+            # Adjust for swapped Start and End Period
+            start_period = row['End Period']  # 'End Period' now contains Start Period data
+            end_period = row['Start Period']  # 'Start Period' now contains End Period data
+
+            # One folder per report type (a sub-tree per report type when more than one is collected)
+            folder_name = f"{sr_no}_{symbol}"  # Use symbol instead of company name
+            Save_Folders = {}
+            for report_type in REPORT_TYPES:
+                report_path = base_path if len(REPORT_TYPES) == 1 else os.path.join(base_path, report_type)
+                Save_Folders[report_type] = os.path.join(report_path, folder_name)
+                os.makedirs(Save_Folders[report_type], exist_ok=True)
+
+            futures.append(executor.submit(
+                extract_company, security_code, symbol, start_period, end_period, Save_Folders
+            ))
+
+        for future in futures:
+            future.result()
+
+    # Download everything the http mode queued, within the request-rate budget
+    results = run_downloads(
+        [job for _, _, _, job in pending_downloads],
+        concurrency=DOWNLOAD_CONCURRENCY, rate_per_host=REQUESTS_PER_SECOND_PER_HOST
+    )
+    for (security_code, report_type, period_text, _), result in zip(pending_downloads, results):
+        if result["Status"] == "Success":
+            manifest.record(security_code, report_type, period_text, result["URL"], result["File Path"])
+        log_message(result["Company"], result["Period"], result["URL"], result["Status"], result["Error"], result["Seconds"])
+finally:
+    if driver_pool is not None:
+        driver_pool.close()
+    if results_client is not None:
+        results_client.close()
+    manifest.close()
+
+# Export this run's journal to an Excel file
+journal.export_excel(os.path.join(base_log_path, log_file_name), LOG_COLUMNS)
+journal.close()
 
 print("Process complete")
\ No newline at end of file
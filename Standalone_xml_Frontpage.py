@@ -7,6 +7,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
+from xbrl_http import (
+    create_session, grid_rows, SECURITY_CODE_COLUMN, PERIOD_COLUMN, STANDALONE_XBRL_COLUMN, CONSOLIDATED_XBRL_COLUMN
+)
+from fetch_engine import run_downloads
+from download_manifest import DownloadManifest
+from run_journal import RunJournal
 
 # Define the folder path where you want to save the XML files (already existing folder)
 save_folder = r"D:\FinancialStatementAnalysis\01ETL\extracted"  # Base folder where XML files will be saved
@@ -18,39 +24,132 @@ df = pd.read_excel(file_path)
 # Define log file name and path
 today_date = datetime.now().strftime("%Y-%m-%d")
 log_file_path = os.path.join(log_path, f"frontpage_{today_date}.xlsx")
-log_data = []  # To store log information
+LOG_COLUMNS = ["Sr. No.", "Symbol", "Period", "Status", "Seconds"]
+journal = RunJournal(os.path.join(log_path, f"frontpage_{today_date}.jsonl"))  # Every log entry, as it happens
 
-def save_xml(symbol, period_value, xml_content, sr_no):
+# "http" reads the XBRL links from the results grid once and downloads the raw files with the
+# asyncio fetch engine; "browser" opens every link and copies the XML viewer source
+DOWNLOAD_MODE = "browser"
+
+# Report types collected from the grid. Listing both fetches standalone and consolidated filings
+# from the same page load, each into its own sub-folder of save_folder
+REPORT_TYPES = ["Standalone"]
+XBRL_COLUMNS = {"Standalone": STANDALONE_XBRL_COLUMN, "Consolidated": CONSOLIDATED_XBRL_COLUMN}
+
+# Request-rate budget for the http downloads: files in flight and requests per second per host
+DOWNLOAD_CONCURRENCY = 8
+REQUESTS_PER_SECOND_PER_HOST = 2.0
+
+# "http" fetches the front page grid with a plain GET and needs no browser at all;
+# "selenium" opens the page in Chrome
+BACKEND = "selenium"
+
+# Filings already saved are recorded here and skipped on later runs
+manifest = DownloadManifest(r"D:\FinancialStatementAnalysis\01ETL\download_manifest.sqlite")
+
+def xml_file_path(symbol, period_value, sr_no, report_type):
     """
-    Save the extracted XML content to a file and move it to the corresponding symbol folder.
+    Return the path of the XML file for a symbol and period, creating the symbol folder if needed.
     """
     # Construct folder name based on Symbol and Sr No
     folder_name = f"{sr_no}_{symbol}"
-    symbol_folder_path = os.path.join(save_folder, folder_name)
+    report_folder = save_folder if len(REPORT_TYPES) == 1 else os.path.join(save_folder, report_type)
+    symbol_folder_path = os.path.join(report_folder, folder_name)
     os.makedirs(symbol_folder_path, exist_ok=True)  # Ensure the folder exists before saving
 
     # Generate the filename for the XML file using Symbol and Period
-    xml_filename = os.path.join(symbol_folder_path, f"{symbol}_{period_value}.xml")
+    return os.path.join(symbol_folder_path, f"{symbol}_{period_value}.xml")
+
+def save_xml(symbol, period_value, xml_content, sr_no, report_type):
+    """
+    Save the extracted XML content to a file and move it to the corresponding symbol folder.
+    """
+    xml_filename = xml_file_path(symbol, period_value, sr_no, report_type)
 
     # Save the XML content to the file
     with open(xml_filename, "w", encoding="utf-8") as file:
         file.write(xml_content)
 
     print(f"XML data for {symbol} saved as {xml_filename}")
+    return xml_filename
+
+def log_message(sr_no, symbol, period_value, status, seconds=None):
+    """
+    Append one entry to the run journal, with the time spent downloading the file when one was downloaded.
+    """
+    journal.record(dict(zip(LOG_COLUMNS, [sr_no, symbol, period_value, status, seconds])))
 
 def save_log_file():
     """
-    Save the log data to an Excel file.
+    Export this run's journal to the Excel log file.
     """
-    log_df = pd.DataFrame(log_data, columns=["Sr. No.", "Symbol", "Period", "Status"])
-    log_df.to_excel(log_file_path, index=False)
+    journal.export_excel(log_file_path, LOG_COLUMNS)
+    journal.close()
     print(f"Log file saved at {log_file_path}")
 
+def lookup_symbol(security_code):
+    """
+    Return the (Symbol, Sr. No.) pair for a security code from the Excel sheet, or (None, None).
+    """
+    for index, excel_row in df.iterrows():
+        if str(excel_row['Security Code']) == security_code:
+            return excel_row['Symbol'], str(excel_row['Sr. No.'])
+    return None, None
+
+def download_grid_xmls(page_source, page_url):
+    """
+    Download the XBRL file of every grid row with the fetch engine, without opening the links in the browser.
+    """
+    jobs = []
+    job_keys = []
+    for i, cells in enumerate(grid_rows(page_source, page_url)):
+        if len(cells) <= max(XBRL_COLUMNS[report_type] for report_type in REPORT_TYPES):
+            continue  # Pager or otherwise incomplete row
+
+        security_code = cells[SECURITY_CODE_COLUMN][0]
+        period_value = cells[PERIOD_COLUMN][0]
+
+        for report_type in REPORT_TYPES:
+            xml_url = cells[XBRL_COLUMNS[report_type]][1]
+
+            if xml_url is None:
+                print(f"No XML link found in row {i}.")
+                log_message("N/A", "N/A", period_value, "No XML link found")
+                continue
+
+            symbol, sr_no = lookup_symbol(security_code)
+            if not symbol:
+                print(f"No matching Symbol found for Security Code {security_code} in Excel sheet.")
+                log_message("N/A", "N/A", period_value, "No matching Symbol found")
+                continue
+
+            if manifest.is_fetched(security_code, report_type, period_value, xml_url):
+                print(f"Already downloaded: {symbol} {period_value}")
+                log_message(sr_no, symbol, period_value, "Already downloaded")
+                continue
+
+            jobs.append((symbol, period_value, xml_url, xml_file_path(symbol, period_value, sr_no, report_type)))
+            job_keys.append((security_code, sr_no, report_type))
+
+    results = run_downloads(jobs, concurrency=DOWNLOAD_CONCURRENCY, rate_per_host=REQUESTS_PER_SECOND_PER_HOST)
+    for (security_code, sr_no, report_type), result in zip(job_keys, results):
+        symbol, period_value = result["Company"], result["Period"]
+        if result["Status"] == "Success":
+            manifest.record(security_code, report_type, period_value, result["URL"], result["File Path"])
+            log_message(sr_no, symbol, period_value, "Success", result["Seconds"])
+        else:
+            print(f"Error occurred while downloading XML content for {security_code}: {result['Error']}")
+            log_message(sr_no, symbol, period_value, "XML content extraction error", result["Seconds"])
+
 def XML_extraction(driver):
     """
     Extract XML data from the website, match it with the symbol from the Excel sheet, and save it.
     """
     try:
+        if DOWNLOAD_MODE == "http":
+            download_grid_xmls(driver.page_source, driver.current_url)
+            return
+
         # Find all rows in the table
         rows = driver.find_elements(By.XPATH, "//*[@id='ContentPlaceHolder1_gvData']/tbody/tr")
         time.sleep(1)
@@ -61,57 +160,64 @@ def XML_extraction(driver):
                 security_code = row.find_element(By.XPATH, ".//td[1]").text.strip()  # Get the Security Code (1st column)
                 period_value = row.find_element(By.XPATH, ".//td[4]").text.strip()  # Get the Period (4th column)
 
-                # Try to locate the XML link in the 7th column
-                try:
-                    xml_link = row.find_element(By.XPATH, ".//td[6]//a")
-                    driver.execute_script("arguments[0].scrollIntoView(true);", xml_link)  # Scroll to the element
-                    WebDriverWait(driver, 10).until(EC.element_to_be_clickable(xml_link))  # Wait until clickable
-                    driver.execute_script("arguments[0].click();", xml_link)  # Click the link using JS
-                    time.sleep(2)
-                except Exception as e:
-                    print(f"No XML link found in row {i}. Error: {str(e)}")
-                    log_data.append(["N/A", "N/A", period_value, "No XML link found"])
-                    continue  # Skip this row if the XML link is missing
-
-                driver.switch_to.window(driver.window_handles[-1])  # Switch to the new window that opens
-                current_url = driver.current_url
-                print(f"Current URL: {current_url}")
-
-                try:
-                    # Extract the XML content directly
-                    xml_div = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, 'webkit-xml-viewer-source-xml')))
-
-                    xml_content = xml_div.get_attribute('innerHTML')  # Extract the XML content
-
-                    # Match the symbol using the security code from the Excel sheet
-                    symbol = None  # Default to None if no match is found
-                    sr_no = None
-                    for index, excel_row in df.iterrows():
-                        if str(excel_row['Security Code']) == security_code:
-                            symbol = excel_row['Symbol']  # Get Symbol from the matching row in the Excel sheet
-                            sr_no = str(excel_row['Sr. No.'])  # Extract Sr No
-                            break
-
-                    # Proceed only if the symbol is found
-                    if symbol:
-                        # Save the XML file and move it to the correct folder
-                        save_xml(symbol, period_value, xml_content, sr_no)
-                        log_data.append([sr_no, symbol, period_value, "Success"])
-                    else:
-                        print(f"No matching Symbol found for Security Code {security_code} in Excel sheet.")
-                        log_data.append(["N/A", "N/A", period_value, "No matching Symbol found"])
-
-                except Exception as e:
-                    print(f"Error occurred while extracting XML content for {security_code}: {str(e)}")
-                    log_data.append(["N/A", "N/A", period_value, "XML content extraction error"])
-
-                driver.close()  # Close the current window
-                driver.switch_to.window(driver.window_handles[0])  # Switch back to the main window
-                time.sleep(1)
+                for report_type in REPORT_TYPES:
+                    # Try to locate the XML link in the column of this report type
+                    try:
+                        xml_link = row.find_element(By.XPATH, f".//td[{XBRL_COLUMNS[report_type] + 1}]//a")
+
+                        # Skip filings an earlier run already saved
+                        link_url = xml_link.get_attribute('href')
+                        if manifest.is_fetched(security_code, report_type, period_value, link_url):
+                            print(f"Already downloaded: {security_code} {period_value}")
+                            log_message("N/A", "N/A", period_value, "Already downloaded")
+                            continue
+
+                        driver.execute_script("arguments[0].scrollIntoView(true);", xml_link)  # Scroll to the element
+                        WebDriverWait(driver, 10).until(EC.element_to_be_clickable(xml_link))  # Wait until clickable
+                        started = time.perf_counter()
+                        driver.execute_script("arguments[0].click();", xml_link)  # Click the link using JS
+                        time.sleep(2)
+                    except Exception as e:
+                        print(f"No XML link found in row {i}. Error: {str(e)}")
+                        log_message("N/A", "N/A", period_value, "No XML link found")
+                        continue  # Skip this row if the XML link is missing
+
+                    driver.switch_to.window(driver.window_handles[-1])  # Switch to the new window that opens
+                    current_url = driver.current_url
+                    print(f"Current URL: {current_url}")
+
+                    try:
+                        # Extract the XML content directly
+                        xml_div = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, 'webkit-xml-viewer-source-xml')))
+
+                        xml_content = xml_div.get_attribute('innerHTML')  # Extract the XML content
+
+                        # Match the symbol using the security code from the Excel sheet
+                        symbol, sr_no = lookup_symbol(security_code)
+
+                        # Proceed only if the symbol is found
+                        if symbol:
+                            # Save the XML file and move it to the correct folder
+                            xml_filename = save_xml(symbol, period_value, xml_content, sr_no, report_type)
+                            if manifest.record(security_code, report_type, period_value, link_url, xml_filename):
+                                log_message(sr_no, symbol, period_value, "Success", round(time.perf_counter() - started, 3))
+                            else:
+                                log_message(sr_no, symbol, period_value, "Not XBRL", round(time.perf_counter() - started, 3))
+                        else:
+                            print(f"No matching Symbol found for Security Code {security_code} in Excel sheet.")
+                            log_message("N/A", "N/A", period_value, "No matching Symbol found")
+
+                    except Exception as e:
+                        print(f"Error occurred while extracting XML content for {security_code}: {str(e)}")
+                        log_message("N/A", "N/A", period_value, "XML content extraction error", round(time.perf_counter() - started, 3))
+
+                    driver.close()  # Close the current window
+                    driver.switch_to.window(driver.window_handles[0])  # Switch back to the main window
+                    time.sleep(1)
 
             except Exception as e:
                 print(f"Error occurred in row {i}: {str(e)}")
-                log_data.append(["N/A", "N/A", "N/A", f"Row error: {str(e)}"])
+                log_message("N/A", "N/A", "N/A", f"Row error: {str(e)}")
 
     except Exception as e:
         print(f"Error occurred during XML extraction: {str(e)}")
@@ -123,6 +229,21 @@ def main():
     # URL for the webpage to scrape
     Top_URL = "https://www.bseindia.com/corporates/Comp_Resultsnew.aspx"
 
+    if BACKEND == "http":
+        # The front page grid needs no search, so a plain GET replaces the browser entirely
+        session = create_session()
+        try:
+            response = session.get(Top_URL, timeout=30)
+            response.raise_for_status()
+            download_grid_xmls(response.text, response.url)
+        finally:
+            save_log_file()
+            session.close()
+            manifest.close()
+
+        print("Process complete")
+        return
+
     # Set up Chrome options for headless browsing (if needed)
     options = Options()
     options.add_argument("--start-maximized")
@@ -144,6 +265,7 @@ def main():
 
         # Close the WebDriver after extraction is complete
         driver.quit()
+        manifest.close()
 
     print("Process complete")
 
@@ -0,0 +1,117 @@
+import os
+import random
+import tempfile
+import time
+import pandas as pd
+from load_excel_to_table import INPUT_COLUMNS, RELEVANT_KEYWORDS, first_relevant_row, clean_facts, process_excel
+
+# Per-file timings of load_excel_to_table.process_excel on synthetic filings of realistic sizes,
+# with the cleaning step compared against the row-by-row version it replaced
+
+ROW_COUNTS = [5000, 20000, 50000]
+REPEATS = 5
+PREAMBLE_SHARE = 0.15  # Share of rows (contexts, units) listed before ScripCode in a filing
+
+
+def synthetic_filing(row_count, seed=0):
+    """Build a converted filing with the columns and value mix of a real one."""
+    rng = random.Random(seed)
+    element_names = [f"Element{i}" for i in range(800)]
+    units = ["OneD", "FourD"] + [f"Context{i}" for i in range(40)]
+
+    preamble_rows = int(row_count * PREAMBLE_SHARE)
+    rows = []
+    for i in range(row_count):
+        if i < preamble_rows:
+            element_name, value = rng.choice(["context", "unit", "period", "identifier"]), None
+        elif i == preamble_rows:
+            element_name, value = "ScripCode", "500002"
+        else:
+            element_name = rng.choice(element_names)
+            value = rng.choice(["Unknown", "", str(rng.randint(-10 ** 9, 10 ** 9)), "Lakhs", "true"])
+        rows.append({
+            'Company Code': "500002",
+            'Financial Year': "2024",
+            'Quarter': "01",
+            'Element Name': element_name,
+            'Unit': rng.choice(units),
+            'Value': value,
+            'Decimal': rng.choice(["-5", "-7", "INF", ""]),
+            'Period Start Date': "2023-04-01",
+            'Period End Date': "2023-06-30",
+            'Nature Of Report': "Standalone",
+            'Context Start Date': "2023-04-01",
+            'Context End Date': "2023-06-30",
+            'Context Instant': None,
+            'Dimensions': None,
+            'Measure': None,
+        })
+    return pd.DataFrame(rows)
+
+
+def legacy_clean(df):
+    """The cleaning process_excel did before it was vectorized."""
+    relevant_row_index = None
+    for idx, row in df.iterrows():
+        if any(keyword in str(row['Element Name']) for keyword in RELEVANT_KEYWORDS):
+            relevant_row_index = idx
+            break
+    if relevant_row_index is not None:
+        df = df.iloc[relevant_row_index:]
+    df = df[~df['Value'].isin(['Unknown', ''])]
+    df = df[df['Element Name'].notna()]
+    df['Unit-Element_Name'] = df['Unit'] + "-" + df['Element Name']
+    return df[['Company Code', 'Financial Year', 'Quarter', 'Element Name', 'Unit', 'Value', 'Decimal', 'Unit-Element_Name', 'Period Start Date', 'Period End Date']]
+
+
+def vectorized_clean(df):
+    relevant_row_index = first_relevant_row(df)
+    if relevant_row_index is not None:
+        df = df.iloc[relevant_row_index:]
+    return clean_facts(df)
+
+
+def best_time(function, *args):
+    """Return the fastest of REPEATS runs, in milliseconds."""
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    pd.options.mode.chained_assignment = None  # The legacy code assigns to a filtered frame
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for row_count in ROW_COUNTS:
+            filing = synthetic_filing(row_count)
+            xlsx_path = os.path.join(temp_dir, f"filing_{row_count}.xlsx")
+            parquet_path = os.path.join(temp_dir, f"filing_{row_count}.parquet")
+            filing.to_excel(xlsx_path, sheet_name='All Data', index=False)
+            filing.to_parquet(parquet_path, index=False)
+
+            # Compare the cleaning step on the same in-memory frame the reader produces
+            in_memory = filing[INPUT_COLUMNS].astype(object)
+            legacy = legacy_clean(in_memory.copy())
+            vectorized = vectorized_clean(in_memory.copy())
+            numeric = (vectorized['Value Type'] == 'numeric').to_numpy()
+            assert legacy.astype(str).reset_index(drop=True).equals(vectorized[legacy.columns].astype(str).reset_index(drop=True))
+            assert vectorized.loc[numeric, 'Numeric Value'].notna().all()
+
+            results.append({
+                'Rows': row_count,
+                'Legacy clean (ms)': best_time(legacy_clean, in_memory.copy()),
+                'Vectorized clean (ms)': best_time(vectorized_clean, in_memory.copy()),
+                'process_excel xlsx (ms)': best_time(process_excel, xlsx_path),
+                'process_excel parquet (ms)': best_time(process_excel, parquet_path),
+            })
+
+    report = pd.DataFrame(results)
+    report['Clean speedup'] = report['Legacy clean (ms)'] / report['Vectorized clean (ms)']
+    print(report.round(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import threading
+from urllib.parse import urljoin
+from lxml import html
+from xbrl_http import create_session, grid_rows, SECURITY_CODE_COLUMN
+
+RESULTS_URL = "https://www.bseindia.com/corporates/Comp_Resultsnew.aspx"
+
+# Form controls on Comp_Resultsnew.aspx, addressed by element id like the Selenium scripts do
+SEARCH_FIELD_ID = "ContentPlaceHolder1_SmartSearch_smartSearch"
+BROADCAST_FIELD_ID = "ContentPlaceHolder1_broadcastdd"
+SUBMIT_BUTTON_ID = "ContentPlaceHolder1_btnSubmit"
+# Hidden field the suggestion list fills in when a company is clicked. Not confirmed against the
+# live page: if it is wrong the post is ignored, which lookup() reports as NoResultsError
+SCRIP_CODE_FIELD_ID = "ContentPlaceHolder1_hdnCode"
+
+
+class NoResultsError(ValueError):
+    """The search returned a results grid without any row for the requested security code."""
+
+
+class ResultsClient:
+    """
+    Replay the Comp_Resultsnew.aspx company search as plain ASP.NET form posts.
+
+    Each worker thread keeps its own keep-alive session and the form state (__VIEWSTATE,
+    __EVENTVALIDATION, ...) of the search page, so a lookup normally costs a single POST.
+    The page returned by lookup() has the same ContentPlaceHolder1_gvData grid the browser shows.
+    The landing page carries that grid too (with the latest results of other companies), so a
+    lookup only succeeds when the grid has rows for the requested security code.
+    """
+
+    def __init__(self, url=RESULTS_URL, timeout=30):
+        self.url = url
+        self.timeout = timeout
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = create_session(pool_size=1)
+            self._local.form = None
+            with self._lock:
+                self._sessions.append(self._local.session)
+        return self._local.session
+
+    def _load_form(self):
+        """GET the search page and keep its form action and field values."""
+        response = self._session().get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        self._local.form = parse_form(response.text, response.url)
+        return self._local.form
+
+    def lookup(self, security_code, broadcast_value="7"):
+        """
+        Submit the search for one security code and return (page_source, page_url) of the results.
+        Raises NoResultsError when the returned grid has no row for the code, even with a fresh form.
+        """
+        session = self._session()
+        response = None
+        for attempt in range(2):
+            form = self._local.form if attempt == 0 and self._local.form else self._load_form()
+            action, fields, ids_to_names = form
+
+            data = dict(fields)
+            data[ids_to_names[SEARCH_FIELD_ID]] = str(security_code)
+            if SCRIP_CODE_FIELD_ID in ids_to_names:
+                data[ids_to_names[SCRIP_CODE_FIELD_ID]] = str(security_code)
+            data[ids_to_names[BROADCAST_FIELD_ID]] = broadcast_value
+            data["__EVENTTARGET"] = ""
+            data["__EVENTARGUMENT"] = ""
+
+            response = session.post(action, data=data, timeout=self.timeout)
+            if response.ok and has_security_rows(response.text, response.url, security_code):
+                return response.text, response.url
+
+            # The cached view state may have expired; fetch a fresh form and try once more
+            self._local.form = None
+
+        response.raise_for_status()
+        raise NoResultsError(f"No results grid rows returned for security code {security_code}")
+
+    def close(self):
+        """Close the sessions of every thread that used this client."""
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+
+
+def has_security_rows(page_source, page_url, security_code):
+    """True if the results grid of the page has at least one row for the security code."""
+    return any(
+        cells[SECURITY_CODE_COLUMN][0] == str(security_code) for cells in grid_rows(page_source, page_url)
+    )
+
+
+def parse_form(page_source, page_url):
+    """
+    Return (action URL, {name: value} of the successful controls, {id: name}) for the page's form.
+    Of the buttons only the search submit button is kept, as if it had been clicked.
+    """
+    tree = html.fromstring(page_source)
+    form = tree.xpath("//form")[0]
+    action = urljoin(page_url, form.get("action") or page_url)
+
+    fields = {}
+    ids_to_names = {}
+    for control in form.xpath(".//input | .//select | .//textarea"):
+        name = control.get("name")
+        if not name:
+            continue
+        if control.get("id"):
+            ids_to_names[control.get("id")] = name
+
+        if control.tag == "select":
+            selected = control.xpath(".//option[@selected]") or control.xpath(".//option")
+            fields[name] = selected[0].get("value", selected[0].text_content()) if selected else ""
+        elif control.tag == "textarea":
+            fields[name] = control.text_content()
+        else:
+            input_type = (control.get("type") or "text").lower()
+            if input_type in ("submit", "button", "image", "reset", "file") and control.get("id") != SUBMIT_BUTTON_ID:
+                continue
+            if input_type in ("checkbox", "radio") and control.get("checked") is None:
+                continue
+            fields[name] = control.get("value", "")
+
+    return action, fields, ids_to_names
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+
+def link_or_copy(source_path, target_path):
+    """
+    Hard-link source_path to target_path, copying it when the two are on different volumes. The
+    link or copy is made under a temporary name and renamed over target_path, so workers placing
+    the same file at once never see it missing or half copied.
+    """
+    temp_path = f"{target_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        try:
+            os.link(source_path, temp_path)
+        except OSError:
+            shutil.copy2(source_path, temp_path)
+        os.replace(temp_path, target_path)
+    finally:
+        # Also left in place when target_path already was a link to the same file, which rename skips
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class ConversionCache:
+    """
+    Converted outputs keyed by the SHA-256 of the source XML and the converter settings, so a
+    filing that was converted before is restored from the cache instead of being parsed again.
+    Each output is kept under cache_dir (hard-linked when possible) together with the period and
+    financial year its file name and folder are built from; an SQLite index maps keys to them.
+    """
+
+    def __init__(self, cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.connection = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), timeout=60, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS conversions (
+                    sha256 TEXT NOT NULL,
+                    settings TEXT NOT NULL,
+                    cached_path TEXT NOT NULL,
+                    period_start_date TEXT,
+                    period_end_date TEXT,
+                    financial_year TEXT,
+                    converted_at TEXT NOT NULL,
+                    PRIMARY KEY (sha256, settings)
+                )
+                """
+            )
+
+    def lookup(self, sha256, settings):
+        """
+        Return (cached path, period start date, period end date, financial year) of an earlier
+        conversion, or None if there is none or its cached output is gone.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT cached_path, period_start_date, period_end_date, financial_year FROM conversions "
+                "WHERE sha256 = ? AND settings = ?",
+                (sha256, settings),
+            ).fetchone()
+        if row is None or not os.path.exists(row[0]):
+            return None
+        return row
+
+    def store(self, sha256, settings, output_path, period_start_date, period_end_date, financial_year):
+        """Keep a link to (or copy of) a fresh output and record it under its key."""
+        extension = os.path.splitext(output_path)[1]
+        cached_folder = os.path.join(self.cache_dir, sha256[:2])
+        os.makedirs(cached_folder, exist_ok=True)
+        cached_path = os.path.join(cached_folder, f"{sha256}_{hashlib.sha256(settings.encode()).hexdigest()[:12]}{extension}")
+        link_or_copy(output_path, cached_path)
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO conversions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (sha256, settings, cached_path, str(period_start_date), str(period_end_date), str(financial_year),
+                 datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from xbrl_http import is_xbrl_document
+
+
+def file_sha256(file_path):
+    """Return the SHA-256 hex digest of a file, read in 1 MB chunks."""
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class DownloadManifest:
+    """
+    SQLite record of every filing already saved, keyed by security code, report type, period and
+    source URL, so re-runs over the same rows only fetch filings that are new. Only files that are
+    XBRL documents are recorded; forget() drops entries so their filings are downloaded again.
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS downloads (
+                    security_code TEXT NOT NULL,
+                    report_type TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    PRIMARY KEY (security_code, report_type, period, url)
+                )
+                """
+            )
+
+    def is_fetched(self, security_code, report_type, period, url):
+        """
+        True if this filing was saved before. Saved files are moved on by the converter and the
+        loader, so a missing file still counts as fetched; a file still at its saved path must
+        match the recorded size and hash, otherwise it was damaged or overwritten and is fetched again.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT file_path, sha256, size FROM downloads "
+                "WHERE security_code = ? AND report_type = ? AND period = ? AND url = ?",
+                (str(security_code), report_type, str(period), url),
+            ).fetchone()
+        if row is None:
+            return False
+        file_path, sha256, size = row
+        if not os.path.exists(file_path):
+            return True
+        return os.path.getsize(file_path) == size and file_sha256(file_path) == sha256
+
+    def record(self, security_code, report_type, period, url, file_path):
+        """
+        Store the hash, size and fetch time of a file that has just been saved. A file that is not
+        an XBRL document (e.g. a saved error page) is not recorded, so it is fetched again next run;
+        returns whether the file was recorded.
+        """
+        if not is_xbrl_document(file_path):
+            return False
+        sha256 = file_sha256(file_path)
+        size = os.path.getsize(file_path)
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(security_code), report_type, str(period), url, file_path,
+                 sha256, size, datetime.now().isoformat(timespec="seconds")),
+            )
+        return True
+
+    def forget(self, security_code, report_type=None, period=None):
+        """
+        Drop the entries of a security code, optionally only those of one report type and period,
+        so the next run downloads those filings again. Returns the number of entries dropped.
+        """
+        conditions = ["security_code = ?"]
+        params = [str(security_code)]
+        if report_type:
+            conditions.append("report_type = ?")
+            params.append(report_type)
+        if period:
+            conditions.append("period = ?")
+            params.append(str(period))
+
+        with self.lock, self.connection:
+            cursor = self.connection.execute(f"DELETE FROM downloads WHERE {' AND '.join(conditions)}", params)
+        return cursor.rowcount
+
+    def close(self):
+        self.connection.close()
+
+
+if __name__ == "__main__":
+    # Force filings to be downloaded again by dropping their entries
+    manifest = DownloadManifest(input("Path of the download manifest: ").strip())
+    code = input("Security code to forget: ").strip()
+    report = input("Report type (blank for all): ").strip()
+    period_name = input("Period, as in the file name (blank for all): ").strip()
+    print(f"Forgot {manifest.forget(code, report, period_name)} entries")
+    manifest.close()
@@ -0,0 +1,95 @@
+import queue
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+
+
+class DriverPool:
+    """
+    Keep a fixed number of warm Chrome WebDrivers and lease them out one company at a time.
+
+    A leased driver is reset (extra windows closed, cookies cleared, blank page) before it goes
+    back to the pool, and it is quit and replaced after max_jobs_per_driver leases to cap the
+    memory growth of long-running browsers. A driver whose lease raised is always replaced.
+    """
+
+    def __init__(self, options, size=4, max_jobs_per_driver=25):
+        self.options = options
+        self.size = size
+        self.max_jobs_per_driver = max_jobs_per_driver
+        self._idle = queue.Queue()
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+        # Start every browser up front so the first companies don't pay the startup cost
+        for _ in range(size):
+            self._idle.put(self._start_driver())
+
+    def _start_driver(self):
+        driver = webdriver.Chrome(options=self.options)
+        with self._lock:
+            self._jobs[driver] = 0
+        return driver
+
+    def _retire(self, driver):
+        with self._lock:
+            self._jobs.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass  # Ignore if the browser is already gone
+
+    def _reset(self, driver):
+        """Bring the driver back to a clean state for the next company."""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.get("about:blank")
+
+    @contextmanager
+    def lease(self):
+        """Borrow a driver for the duration of the with-block."""
+        driver = self._idle.get()
+        if driver is None:
+            # The previous driver in this slot was recycled; start its replacement now
+            try:
+                driver = self._start_driver()
+            except Exception:
+                self._idle.put(None)
+                raise
+
+        healthy = False
+        try:
+            yield driver
+            healthy = True
+        finally:
+            self._release(driver, healthy)
+
+    def _release(self, driver, healthy):
+        with self._lock:
+            self._jobs[driver] += 1
+            worn_out = self._jobs[driver] >= self.max_jobs_per_driver
+
+        if healthy and not worn_out:
+            try:
+                self._reset(driver)
+                self._idle.put(driver)
+                return
+            except Exception as e:
+                print(f"Driver reset failed, replacing browser: {e}")
+
+        self._retire(driver)
+        self._idle.put(None)
+
+    def close(self):
+        """Quit every idle driver. Call once all leases have been returned."""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None:
+                self._retire(driver)
@@ -0,0 +1,76 @@
+import math
+import re
+import numpy as np
+import pandas as pd
+
+# Typed forms of fact values: each fact is classified as numeric, date, boolean or text, numbers
+# are parsed to float64 and the XBRL decimals attribute to a small integer. Only a fact with a unit
+# (a unitRef, or the decimals attribute only numeric facts carry) is numeric, so identifiers such as
+# a scrip code or a phone number stay text however they look. The float is for arithmetic; the
+# exact lexical form stays in the fact text. XBRL numbers are written unscaled, so decimals only
+# records their precision: -5 means rounded to lakhs, INF means exact. INF and missing decimals
+# become null; the Decimal text still tells them apart.
+
+TYPED_COLUMNS = ['Value Type', 'Numeric Value', 'Decimals']
+
+# Lexical forms of xs:decimal/xs:double (without INF/NaN), xs:date and xs:boolean
+NUMBER_PATTERN = r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?'
+DATE_PATTERN = r'\d{4}-\d{2}-\d{2}'
+DECIMALS_PATTERN = r'[+-]?\d+'
+BOOLEAN_VALUES = ['true', 'false']
+
+NUMBER_RE = re.compile(NUMBER_PATTERN)
+DATE_RE = re.compile(DATE_PATTERN)
+DECIMALS_RE = re.compile(DECIMALS_PATTERN)
+
+
+def has_unit(measure, decimals):
+    """Whether one fact is a numeric item: it has a unit measure or a decimals attribute."""
+    return measure is not None or bool(decimals)
+
+
+def classify_value(value, with_unit):
+    """Return (value type, float value or None) for the text of one fact; None text has no type."""
+    if value is None:
+        return None, None
+    if with_unit and NUMBER_RE.fullmatch(value):
+        number = float(value)
+        if math.isfinite(number):
+            return 'numeric', number
+    if DATE_RE.fullmatch(value):
+        return 'date', None
+    if value in BOOLEAN_VALUES:
+        return 'boolean', None
+    return 'text', None
+
+
+def parse_decimals(decimals):
+    """Return the decimals attribute as an int, or None for INF or a missing attribute."""
+    return int(decimals) if decimals and DECIMALS_RE.fullmatch(decimals) else None
+
+
+def typed_values(values, decimals, measures):
+    """
+    Vectorized has_unit, classify_value and parse_decimals over Series of fact text, decimals text
+    and unit measures. Returns (value types, numeric values, decimals) aligned with the input index.
+    """
+    text = values.astype('string')
+    decimals_text = decimals.astype('string')
+    with_unit = (measures.notna() | decimals_text.fillna('').ne('')).to_numpy()
+    numbers = pd.to_numeric(text.where(text.str.fullmatch(NUMBER_PATTERN).fillna(False) & with_unit), errors='coerce')
+    numbers = numbers.astype('float64')
+    is_numeric = np.isfinite(numbers)
+    is_date = text.str.fullmatch(DATE_PATTERN).fillna(False).astype(bool)
+    is_boolean = text.isin(BOOLEAN_VALUES).fillna(False).astype(bool)
+    value_types = np.select(
+        [is_numeric, is_date, is_boolean, text.notna().to_numpy()],
+        ['numeric', 'date', 'boolean', 'text'],
+        default=None,
+    )
+
+    decimals_text = decimals_text.where(decimals_text.str.fullmatch(DECIMALS_PATTERN).fillna(False))
+    return (
+        pd.Series(value_types, index=values.index, dtype=object),
+        numbers.where(is_numeric),
+        pd.to_numeric(decimals_text, errors='coerce').astype('Int16'),
+    )
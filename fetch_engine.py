@@ -0,0 +1,156 @@
+import asyncio
+import os
+import time
+from urllib.parse import urlparse
+import aiohttp
+from xbrl_http import DEFAULT_USER_AGENT, is_xbrl_document
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class NotXbrlError(ValueError):
+    """The server answered with something other than an XBRL document, e.g. an HTML error page."""
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average, with bursts of up to `capacity` requests."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Throughput:
+    """Running totals for the progress report."""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+
+    def report(self):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        print(
+            f"Downloaded {self.done}/{self.total} files ({self.failed} failed), "
+            f"{self.done / elapsed:.1f} files/s, {self.bytes / elapsed / 1024 / 1024:.2f} MB/s"
+        )
+
+
+async def fetch_job(session, job, semaphore, buckets, stats, max_retries, chunk_size):
+    """Download one (company, period, url, file_path) job, streaming the body to disk."""
+    company, period, url, file_path = job
+    bucket = buckets[urlparse(url).netloc]
+    result = {"Company": company, "Period": period, "URL": url, "File Path": file_path,
+              "Status": "File not saved", "Bytes": 0, "Seconds": None, "Error": None}
+
+    async with semaphore:
+        started = time.monotonic()  # Seconds covers every attempt, failed or not
+        for attempt in range(1, max_retries + 1):
+            await bucket.acquire()
+            try:
+                async with session.get(url) as response:
+                    if response.status in RETRY_STATUSES and attempt < max_retries:
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    response.raise_for_status()
+
+                    # Write to a temporary name so an interrupted download never looks complete
+                    temp_path = file_path + ".part"
+                    size = 0
+                    try:
+                        with open(temp_path, "wb") as file:
+                            async for chunk in response.content.iter_chunked(chunk_size):
+                                file.write(chunk)
+                                size += len(chunk)
+                        if not is_xbrl_document(temp_path):
+                            raise NotXbrlError(f"{response.content_type} body of {size} bytes is not an XBRL document")
+                        os.replace(temp_path, file_path)
+                    except BaseException:
+                        # Do not leave the partial file behind, whatever broke the stream
+                        if os.path.exists(temp_path):
+                            os.remove(temp_path)
+                        raise
+
+                result.update({"Status": "Success", "Bytes": size, "Error": None})
+                stats.bytes += size
+                break
+
+            except NotXbrlError as e:
+                result.update({"Status": "Not XBRL", "Error": str(e)})
+                break
+
+            except aiohttp.ClientResponseError as e:
+                # Retryable statuses were retried above; any other error status will not change
+                result["Error"] = f"{type(e).__name__}: {e}"
+                break
+
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                result["Error"] = f"{type(e).__name__}: {e}"
+                if attempt < max_retries:
+                    await asyncio.sleep(2 ** attempt)
+        result["Seconds"] = round(time.monotonic() - started, 3)
+
+    stats.done += 1
+    if result["Status"] != "Success":
+        stats.failed += 1
+    return result
+
+
+async def report_progress(stats, every):
+    while True:
+        await asyncio.sleep(every)
+        stats.report()
+
+
+async def fetch_all(jobs, concurrency=8, rate_per_host=2.0, burst=None, report_every=5.0,
+                    max_retries=3, timeout=60, chunk_size=64 * 1024, user_agent=DEFAULT_USER_AGENT):
+    """
+    Download every job with at most `concurrency` requests in flight and at most `rate_per_host`
+    requests per second to any one host. Returns one result dict per job, in job order.
+    """
+    jobs = list(jobs)
+    stats = Throughput(len(jobs))
+    semaphore = asyncio.Semaphore(concurrency)
+    buckets = {}
+    for job in jobs:
+        host = urlparse(job[2]).netloc
+        if host not in buckets:
+            buckets[host] = TokenBucket(rate_per_host, burst)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers={"User-Agent": user_agent}) as session:
+        reporter = asyncio.create_task(report_progress(stats, report_every))
+        try:
+            results = await asyncio.gather(*(
+                fetch_job(session, job, semaphore, buckets, stats, max_retries, chunk_size) for job in jobs
+            ))
+        finally:
+            reporter.cancel()
+
+    stats.report()
+    return results
+
+
+def run_downloads(jobs, **kwargs):
+    """Blocking entry point for the scraper scripts; see fetch_all for the options."""
+    if not jobs:
+        return []
+    return asyncio.run(fetch_all(jobs, **kwargs))
@@ -2,24 +2,33 @@ import os
 import time
 import pandas as pd
 import traceback
-from selenium import webdriver
+from concurrent.futures import ThreadPoolExecutor
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from openpyxl import Workbook
+from driver_pool import DriverPool
+from run_journal import RunJournal
 
 # Chrome options
 options = Options()
 options.add_argument("--start-maximized")
 options.add_argument("--headless")  # Uncomment if you don't need to see browser interactions
 
-# Initialize a list to hold log data
-log_data = []
+# Number of warm browsers (and companies processed in parallel), and how many companies
+# a browser serves before it is restarted to release memory
+DRIVER_POOL_SIZE = 4
+MAX_JOBS_PER_DRIVER = 25
+
+# Log entries are appended to this journal as they happen (opened once the row range is known)
+# and exported to the Excel log at the end
+LOG_COLUMNS = ["Stock Name", "File Name", "URL", "Status", "Error Line"]
+journal = None
 
 def log_message(stock_name, file_name, url, status, error_line=None):
-    log_data.append({
+    journal.record({
         "Stock Name": stock_name,
         "File Name": file_name,
         "URL": url,
@@ -58,10 +67,13 @@ def scrape_page_content_selenium(driver, excel_file_path):
 # XML extraction logic including scraping the page
 def XML_extraction(row_number, Security_code, Stock_Name, Save_Folder):
     Top_URL = "https://www.bseindia.com/corporates/Comp_Resultsnew.aspx"
-    driver = webdriver.Chrome(options=options)
-    driver.get(Top_URL)
-    print(Stock_Name)
+    with driver_pool.lease() as driver:
+        driver.get(Top_URL)
+        print(Stock_Name)
+        scrape_company_pages(driver, Top_URL, Security_code, Stock_Name, Save_Folder)
+
 
+def scrape_company_pages(driver, Top_URL, Security_code, Stock_Name, Save_Folder):
     try:
         # Search for the security code
         Security_Search = WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.ID, "ContentPlaceHolder1_SmartSearch_smartSearch")))
@@ -126,9 +138,6 @@ def XML_extraction(row_number, Security_code, Stock_Name, Save_Folder):
         log_message(Stock_Name, "N/A", Top_URL, "Extraction Failed", error_line)
         print(f"Error occurred during XML extraction for {Stock_Name}: {str(e)}")
 
-    finally:
-        driver.quit()
-
 # Path to your input Excel file
 Sample_List = r"D:\lifeinsurance_excel\input\sampleinput_life.xlsx"
 
@@ -145,28 +154,39 @@ if start_row < 1 or end_row > len(df):
 else:
     df_range = df.iloc[start_row-1:end_row]
 
+    base_log_path = r"D:\lifeinsurance_excel\log"
+    log_file_name = f"log_rows_{start_row}_to_{end_row}.xlsx"
+    journal = RunJournal(os.path.join(base_log_path, log_file_name.replace(".xlsx", ".jsonl")))
+
     # Base path for saving XML files
     base_path = r"D:\lifeinsurance_excel\excel"
    
-    # Using the Excel row number for saving files
-    for row_number, (index, row) in enumerate(df_range.iterrows(), start=start_row):
-        Security_code = str(row['Security Code'])
-        Stock_Name = str(row['Symbol'])
-        Sr_No = str(row['Sr. No.'])  # Extract the 'Sr.No.' column from the DataFrame
+    # Start the warm browsers shared by all companies
+    driver_pool = DriverPool(options, size=DRIVER_POOL_SIZE, max_jobs_per_driver=MAX_JOBS_PER_DRIVER)
 
-        # Create the folder with only Sr.No. and company name
-        folder_name = f"{Sr_No}_{Stock_Name}"  # Use only Sr.No. and stock name for folder name
-        Save_Folder = os.path.join(base_path, folder_name)
-        os.makedirs(Save_Folder, exist_ok=True)
-
-        # Pass the row number from Excel to the XML extraction function
-        XML_extraction(row_number, Security_code, Stock_Name, Save_Folder)
-
-    # Save the log data to an Excel file
-    base_log_path = r"D:\lifeinsurance_excel\log"
-    os.makedirs(base_log_path, exist_ok=True)
+    try:
+        with ThreadPoolExecutor(max_workers=DRIVER_POOL_SIZE) as executor:
+            futures = []
+            # Using the Excel row number for saving files
+            for row_number, (index, row) in enumerate(df_range.iterrows(), start=start_row):
+                Security_code = str(row['Security Code'])
+                Stock_Name = str(row['Symbol'])
+                Sr_No = str(row['Sr. No.'])  # Extract the 'Sr.No.' column from the DataFrame
+
+                # Create the folder with only Sr.No. and company name
+                folder_name = f"{Sr_No}_{Stock_Name}"  # Use only Sr.No. and stock name for folder name
+                Save_Folder = os.path.join(base_path, folder_name)
+                os.makedirs(Save_Folder, exist_ok=True)
+
+                # Pass the row number from Excel to the XML extraction function
+                futures.append(executor.submit(XML_extraction, row_number, Security_code, Stock_Name, Save_Folder))
+
+            for future in futures:
+                future.result()
+    finally:
+        driver_pool.close()
 
-    log_file_name = f"log_rows_{start_row}_to_{end_row}.xlsx"
-    log_df = pd.DataFrame(log_data, columns=["Stock Name", "File Name", "URL", "Status", "Error Line"])
-    log_df.to_excel(os.path.join(base_log_path, log_file_name), index=False)
+    # Export this run's journal to an Excel file
+    journal.export_excel(os.path.join(base_log_path, log_file_name), LOG_COLUMNS)
+    journal.close()
     print("Process complete")
@@ -0,0 +1,60 @@
+import json
+import os
+import threading
+from datetime import datetime
+import pandas as pd
+
+
+class RunJournal:
+    """
+    Append-only JSON Lines log of a run. Every entry is written and flushed as soon as it is
+    recorded, so a crash keeps everything logged up to that point; the Excel log is exported from
+    the journal at the end. Entries are tagged with the run they belong to and when they were logged.
+    """
+
+    def __init__(self, journal_path):
+        os.makedirs(os.path.dirname(journal_path) or ".", exist_ok=True)
+        self.journal_path = journal_path
+        self.run_started = datetime.now().isoformat(timespec="microseconds")
+        self.file = open(journal_path, "a+", encoding="utf-8")
+        self.lock = threading.Lock()
+
+        # Start on a fresh line if an earlier run crashed in the middle of writing an entry
+        if self.file.tell() > 0:
+            self.file.seek(self.file.tell() - 1)
+            if self.file.read(1) != "\n":
+                self.file.write("\n")
+
+    def record(self, entry):
+        """Append one log entry (a dict of column -> value)."""
+        line = dict(entry)
+        line["Run"] = self.run_started
+        line["Logged At"] = datetime.now().isoformat(timespec="milliseconds")
+        text = json.dumps(line, default=str)  # numpy numbers, paths and timestamps as text
+        with self.lock:
+            self.file.write(text + "\n")
+            self.file.flush()
+
+    def entries(self, all_runs=False):
+        """Return the entries of this run (or of every run in the file), in the order logged."""
+        with self.lock:
+            self.file.flush()
+        entries = []
+        with open(self.journal_path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Last line of a run that crashed mid-write
+                if all_runs or entry.get("Run") == self.run_started:
+                    entries.append(entry)
+        return entries
+
+    def export_excel(self, excel_path, columns, all_runs=False):
+        """Write the entries to an Excel file with the given columns followed by the logging time."""
+        log_df = pd.DataFrame(self.entries(all_runs), columns=list(columns) + ["Logged At"])
+        log_df.to_excel(excel_path, index=False)
+        return log_df
+
+    def close(self):
+        self.file.close()
@@ -2,39 +2,79 @@ import os
 import time
 import pandas as pd
 import traceback
-from selenium import webdriver
+from concurrent.futures import ThreadPoolExecutor
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
+from driver_pool import DriverPool
+from bse_client import ResultsClient, NoResultsError
+from xbrl_http import grid_rows, xbrl_links, STANDALONE_XBRL_COLUMN, CONSOLIDATED_XBRL_COLUMN
+from fetch_engine import run_downloads
+from download_manifest import DownloadManifest
+from run_journal import RunJournal
 
 # Chrome options
 options = Options()
 options.add_argument("--start-maximized")
 options.add_argument("--headless")  # If you want to see browser interactions, comment this line
 
-# Initialize a list to hold log data
-log_data = []
+# Number of warm browsers (and companies processed in parallel), and how many companies
+# a browser serves before it is restarted to release memory
+DRIVER_POOL_SIZE = 4
+MAX_JOBS_PER_DRIVER = 25
 
-def log_message(stock_name, file_name, url, status, error_line=None):
-    log_data.append({
+# "http" reads the XBRL links from the results grid once and downloads the raw files with the
+# asyncio fetch engine; "browser" opens every link and copies the XML viewer source
+DOWNLOAD_MODE = "browser"
+
+# Report types collected from each company's results grid. The grid is loaded once for all of
+# them; listing both fetches standalone and consolidated filings in one pass, each into its own
+# sub-folder of the output path
+REPORT_TYPES = ["Standalone"]
+XBRL_COLUMNS = {"Standalone": STANDALONE_XBRL_COLUMN, "Consolidated": CONSOLIDATED_XBRL_COLUMN}
+
+# Request-rate budget for the http downloads: files in flight and requests per second per host
+DOWNLOAD_CONCURRENCY = 8
+REQUESTS_PER_SECOND_PER_HOST = 2.0
+
+# "http" replays the company search as plain form posts (no browser at all, files are always
+# downloaded over HTTP); "selenium" drives the search page through the driver pool
+BACKEND = "selenium"
+HTTP_WORKERS = 16
+
+# Filings already saved are recorded here and skipped on later runs
+MANIFEST_PATH = r"D:\Consolidated_xml_file\download_manifest.sqlite"
+
+# Log entries are appended to this journal as they happen (opened once the row range is known)
+# and exported to the Excel log at the end
+LOG_COLUMNS = ["Stock Name", "File Name", "URL", "Status", "Error Line", "Seconds"]
+journal = None
+
+# (security code, report type, (company, period, url, file path)) of the files found in http mode,
+# downloaded once all lookups are done
+pending_downloads = []
+
+def log_message(stock_name, file_name, url, status, error_line=None, seconds=None):
+    journal.record({
         "Stock Name": stock_name,
         "File Name": file_name,
         "URL": url,
         "Status": status,
-        "Error Line": error_line
+        "Error Line": error_line,
+        "Seconds": seconds  # Time spent downloading the file, when one was downloaded
     })
 
-def XML_extraction_with_retry(sr_no, row_number, security_code, stock_name, save_folder, max_retries=5):
+def XML_extraction_with_retry(sr_no, row_number, security_code, stock_name, save_folders, max_retries=5):
     retry_count = 0
     success = False
 
     while retry_count < max_retries and not success:
         retry_count += 1
         print(f"Attempt {retry_count} for {stock_name}")
-        success = XML_extraction(sr_no, row_number, security_code, stock_name, save_folder)
+        success = XML_extraction(sr_no, row_number, security_code, stock_name, save_folders)
 
         if not success:
             wait_time = 2 ** retry_count  # Exponential backoff: 2, 4, 8, 16, ...
@@ -47,11 +87,17 @@ def XML_extraction_with_retry(sr_no, row_number, security_code, stock_name, save
 # Main function usage remains the same
 
 
-def XML_extraction(sr_no, row_number, security_code, stock_name, save_folder):
+def XML_extraction(sr_no, row_number, security_code, stock_name, save_folders):
     Top_URL = "https://www.bseindia.com/corporates/Comp_Resultsnew.aspx"
-    driver = webdriver.Chrome(options=options)
-    driver.get(Top_URL)
+    if BACKEND == "http":
+        return extract_company_xmls_http(Top_URL, security_code, stock_name, save_folders)
 
+    with driver_pool.lease() as driver:
+        driver.get(Top_URL)
+        return extract_company_xmls(driver, Top_URL, security_code, stock_name, save_folders)
+
+
+def extract_company_xmls(driver, Top_URL, security_code, stock_name, save_folders):
     try:
         Security_Search = WebDriverWait(driver, 10).until(
             EC.visibility_of_element_located((By.ID, "ContentPlaceHolder1_SmartSearch_smartSearch"))
@@ -69,55 +115,13 @@ def XML_extraction(sr_no, row_number, security_code, stock_name, save_folder):
         Submit_button = driver.find_element(By.ID, "ContentPlaceHolder1_btnSubmit")
         Submit_button.click()
 
-        rows = driver.find_elements(By.XPATH, f"//td[text()='{security_code}']/following-sibling::td[5]//a")
-        File_Name_rows = driver.find_elements(By.XPATH, f"//td[text()='{security_code}']/following-sibling::td[3]//a")
-        time.sleep(1)
+        if DOWNLOAD_MODE == "http":
+            return queue_company_xmls(driver.page_source, driver.current_url, security_code, stock_name, save_folders)
 
         success_count = 0
 
-        for i in range(len(rows)):
-            link = rows[i]
-            File_Name = File_Name_rows[i].text
-            print(File_Name)
-            time.sleep(1)
-            link.click()
-            driver.switch_to.window(driver.window_handles[-1])
-            current_url = driver.current_url
-            print(current_url)
-
-            # Only include the company name and file name without the row number in the file name
-            custom_file_name = f"{stock_name}_{File_Name}.xml"  # File name without the row number
-            custom_file_path = os.path.join(save_folder, custom_file_name)  # Keep .xml extension
-
-            try:
-                # Extract the XML content directly
-                xml_div = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.ID, 'webkit-xml-viewer-source-xml'))
-                )
-                xml_content = xml_div.get_attribute('innerHTML')  # Extract the XML content
-
-                # Save XML content
-                with open(custom_file_path, 'w', encoding='utf-8') as file:
-                    file.write(xml_content)
-
-                # Log success
-                log_message(stock_name, File_Name, current_url, "Success")
-                success_count += 1
-
-            except Exception as e:
-                # Get the traceback to identify the error line number
-                tb_str = traceback.format_exc()
-                error_line = 'Unknown'
-                for line in tb_str.splitlines():
-                    if 'File' in line and ', line ' in line:
-                        error_line = line.strip()
-                        break
-                log_message(stock_name, File_Name, current_url, "File not saved", error_line)
-                print(f"Error saving XML file for {stock_name} - {File_Name}: {str(e)}")
-
-            driver.close()
-            driver.switch_to.window(driver.window_handles[0])
-            time.sleep(1)
+        for report_type in REPORT_TYPES:
+            success_count += save_report_xmls(driver, security_code, stock_name, report_type, save_folders[report_type])
 
         return success_count > 0  # Return True if at least one file is successfully downloaded
 
@@ -132,8 +136,117 @@ def XML_extraction(sr_no, row_number, security_code, stock_name, save_folder):
         print(f"Error occurred during XML extraction for {stock_name}: {str(e)}")
         return False  # Indicate failure for the entire company
 
-    finally:
-        driver.quit()
+def save_report_xmls(driver, security_code, stock_name, report_type, save_folder):
+    """Open every XBRL link of one report type in the loaded grid and save it; returns the files saved."""
+    sibling = XBRL_COLUMNS[report_type]
+    rows = driver.find_elements(By.XPATH, f"//td[text()='{security_code}']/following-sibling::td[{sibling}]//a")
+    File_Name_rows = driver.find_elements(By.XPATH, f"//td[text()='{security_code}']/following-sibling::td[3]//a")
+    time.sleep(1)
+
+    success_count = 0
+
+    for i in range(len(rows)):
+        link = rows[i]
+        File_Name = File_Name_rows[i].text
+        print(File_Name)
+
+        link_url = link.get_attribute('href')
+        if manifest.is_fetched(security_code, report_type, File_Name, link_url):
+            print(f"Already downloaded: {File_Name}")
+            log_message(stock_name, File_Name, link_url, "Already downloaded")
+            success_count += 1
+            continue
+
+        time.sleep(1)
+        started = time.perf_counter()
+        link.click()
+        driver.switch_to.window(driver.window_handles[-1])
+        current_url = driver.current_url
+        print(current_url)
+
+        # Only include the company name and file name without the row number in the file name
+        custom_file_name = f"{stock_name}_{File_Name}.xml"  # File name without the row number
+        custom_file_path = os.path.join(save_folder, custom_file_name)  # Keep .xml extension
+
+        try:
+            # Extract the XML content directly
+            xml_div = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.ID, 'webkit-xml-viewer-source-xml'))
+            )
+            xml_content = xml_div.get_attribute('innerHTML')  # Extract the XML content
+
+            # Save XML content
+            with open(custom_file_path, 'w', encoding='utf-8') as file:
+                file.write(xml_content)
+            # Log success, unless the viewer held something other than a filing
+            if manifest.record(security_code, report_type, File_Name, link_url, custom_file_path):
+                log_message(stock_name, File_Name, current_url, "Success", seconds=round(time.perf_counter() - started, 3))
+                success_count += 1
+            else:
+                log_message(stock_name, File_Name, current_url, "Not XBRL", seconds=round(time.perf_counter() - started, 3))
+
+        except Exception as e:
+            # Get the traceback to identify the error line number
+            tb_str = traceback.format_exc()
+            error_line = 'Unknown'
+            for line in tb_str.splitlines():
+                if 'File' in line and ', line ' in line:
+                    error_line = line.strip()
+                    break
+            log_message(stock_name, File_Name, current_url, "File not saved", error_line, round(time.perf_counter() - started, 3))
+            print(f"Error saving XML file for {stock_name} - {File_Name}: {str(e)}")
+
+        driver.close()
+        driver.switch_to.window(driver.window_handles[0])
+        time.sleep(1)
+
+    return success_count
+
+def extract_company_xmls_http(Top_URL, security_code, stock_name, save_folders):
+    """Look the company up with plain form posts and download its XBRL files, no browser involved."""
+    try:
+        page_source, page_url = results_client.lookup(security_code)
+    except NoResultsError as e:
+        # The search post was ignored or the company has no results; retrying the same post will not help
+        log_message(stock_name, "N/A", Top_URL, "No results for security code", str(e))
+        print(f"No results returned for {stock_name}: {str(e)}")
+        return True
+    except Exception as e:
+        tb_str = traceback.format_exc()
+        error_line = 'Unknown'
+        for line in tb_str.splitlines():
+            if 'File' in line and ', line ' in line:
+                error_line = line.strip()
+                break
+        log_message(stock_name, "N/A", Top_URL, "Extraction Failed", error_line)
+        print(f"Error occurred during XML extraction for {stock_name}: {str(e)}")
+        return False
+
+    return queue_company_xmls(page_source, page_url, security_code, stock_name, save_folders)
+
+def queue_company_xmls(page_source, page_url, security_code, stock_name, save_folders):
+    """Queue every XBRL file listed in the results grid for the download engine."""
+    found_count = 0
+    rows = grid_rows(page_source, page_url)  # Parsed once for every report type
+
+    for report_type in REPORT_TYPES:
+        for File_Name, xml_url in xbrl_links(rows, security_code, XBRL_COLUMNS[report_type]):
+            print(File_Name)
+            if xml_url is None:
+                log_message(stock_name, File_Name, page_url, "No XML link found")
+                continue
+
+            found_count += 1
+            if manifest.is_fetched(security_code, report_type, File_Name, xml_url):
+                print(f"Already downloaded: {File_Name}")
+                log_message(stock_name, File_Name, xml_url, "Already downloaded")
+                continue
+
+            custom_file_name = f"{stock_name}_{File_Name}.xml"
+            custom_file_path = os.path.join(save_folders[report_type], custom_file_name)
+            pending_downloads.append((security_code, report_type, (stock_name, File_Name, xml_url, custom_file_path)))
+
+    return found_count > 0
 
 # Path to your input Excel file
 Sample_List = r"D:\Consolidated_xml_file\input\ListofStocks.xlsx"
@@ -151,28 +264,68 @@ if start_row < 1 or end_row > len(df):
 else:
     df_range = df.iloc[start_row-1:end_row]
 
+    base_log_path = r"D:\Consolidated_xml_file\log"
+    log_file_name = f"log_rows_{start_row}_to_{end_row}.xlsx"
+    journal = RunJournal(os.path.join(base_log_path, log_file_name.replace(".xlsx", ".jsonl")))
+
     # Base path for saving XML files
     base_path = r"D:\Consolidated_xml_file\xml"
 
-    # Using the Excel row number for saving files
-    for row_number, (index, row) in enumerate(df_range.iterrows(), start=start_row):
-        sr_no = str(row['Sr. No.'])  # Extract the Sr. No. from the input file
-        security_code = str(row['Security Code'])
-        stock_name = str(row['Symbol'])
-
-        # Create the folder with the Sr. No., row number, and company name
-        folder_name = f"{sr_no}_{stock_name}"  # Prefix the folder with Sr. No.
-        Save_Folder = os.path.join(base_path, folder_name)
-        os.makedirs(Save_Folder, exist_ok=True)
+    manifest = DownloadManifest(MANIFEST_PATH)
 
-        # Pass the row number from Excel to the XML extraction function
-        XML_extraction_with_retry(sr_no, row_number, security_code, stock_name, Save_Folder)
+    # Start the warm browsers shared by all companies, or the form-post client when no browser is used
+    driver_pool = None
+    results_client = None
+    if BACKEND == "http":
+        results_client = ResultsClient()
+        workers = HTTP_WORKERS
+    else:
+        driver_pool = DriverPool(options, size=DRIVER_POOL_SIZE, max_jobs_per_driver=MAX_JOBS_PER_DRIVER)
+        workers = DRIVER_POOL_SIZE
 
-    # Save the log data to an Excel file
-    base_log_path = r"D:\Consolidated_xml_file\log"
-    os.makedirs(base_log_path, exist_ok=True)
-
-    log_file_name = f"log_rows_{start_row}_to_{end_row}.xlsx"
-    log_df = pd.DataFrame(log_data, columns=["Stock Name", "File Name", "URL", "Status", "Error Line"])
-    log_df.to_excel(os.path.join(base_log_path, log_file_name), index=False)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            # Using the Excel row number for saving files
+            for row_number, (index, row) in enumerate(df_range.iterrows(), start=start_row):
+                sr_no = str(row['Sr. No.'])  # Extract the Sr. No. from the input file
+                security_code = str(row['Security Code'])
+                stock_name = str(row['Symbol'])
+
+                # Create the folder with the Sr. No., row number, and company name, one per report type
+                # (a sub-tree per report type when more than one is collected)
+                folder_name = f"{sr_no}_{stock_name}"  # Prefix the folder with Sr. No.
+                Save_Folders = {}
+                for report_type in REPORT_TYPES:
+                    report_path = base_path if len(REPORT_TYPES) == 1 else os.path.join(base_path, report_type)
+                    Save_Folders[report_type] = os.path.join(report_path, folder_name)
+                    os.makedirs(Save_Folders[report_type], exist_ok=True)
+
+                # Pass the row number from Excel to the XML extraction function
+                futures.append(executor.submit(
+                    XML_extraction_with_retry, sr_no, row_number, security_code, stock_name, Save_Folders
+                ))
+
+            for future in futures:
+                future.result()
+
+        # Download everything the http mode queued, within the request-rate budget
+        results = run_downloads(
+            [job for _, _, job in pending_downloads],
+            concurrency=DOWNLOAD_CONCURRENCY, rate_per_host=REQUESTS_PER_SECOND_PER_HOST
+        )
+        for (security_code, report_type, _), result in zip(pending_downloads, results):
+            if result["Status"] == "Success":
+                manifest.record(security_code, report_type, result["Period"], result["URL"], result["File Path"])
+            log_message(result["Company"], result["Period"], result["URL"], result["Status"], result["Error"], result["Seconds"])
+    finally:
+        if driver_pool is not None:
+            driver_pool.close()
+        if results_client is not None:
+            results_client.close()
+        manifest.close()
+
+    # Export this run's journal to an Excel file
+    journal.export_excel(os.path.join(base_log_path, log_file_name), LOG_COLUMNS)
+    journal.close()
     print("Process complete")
@@ -1,22 +1,80 @@
 from lxml import etree
+import copy
+import numpy as np
 import pandas as pd
 from openpyxl import Workbook, load_workbook
 from openpyxl.utils.dataframe import dataframe_to_rows
 import os
-import time
-import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import shutil
+import time
 import traceback
 from datetime import datetime
+from taxonomy_cache import cached_taxonomy_names
+from fact_values import TYPED_COLUMNS, classify_value, has_unit, parse_decimals, typed_values
+from run_journal import RunJournal
+from work_planner import scan_input_tree, plan_jobs
+from conversion_cache import ConversionCache, link_or_copy
+from download_manifest import file_sha256
  
-log_columns = ['Stock', 'Period', 'Status', 'Message', 'Error Line']
-log_df = pd.DataFrame(columns=log_columns)
+log_columns = ['Stock', 'Period', 'Status', 'Message', 'Error Line', 'Seconds']
+
+# "tree" parses each filing into memory before writing it; "stream" reads it with iterparse and
+# writes rows as they are produced, so memory stays flat however large the filing is
+PARSE_MODE = "tree"
+
+# "xlsx" writes one workbook per filing; "parquet" writes one Parquet file per filing into a
+# "Financial Year=<year>" sub-folder of the company folder, which is far faster to write and load
+OUTPUT_FORMAT = "xlsx"
+PARQUET_BATCH_ROWS = 50000  # Rows per row group when streaming to Parquet
+
+# Emit only real facts (elements with a contextRef) instead of every element, dropping contexts,
+# units and other structural nodes the loader throws away anyway
+FACTS_ONLY = False
+# Emit only facts whose Unit-Element_Name is in the local taxonomy cache the loader keeps
+TAXONOMY_FILTER = False
+
+# Outputs of converted filings are kept here, keyed by the SHA-256 of the XML and the converter
+# settings, and reused when identical bytes are dropped again; None turns the cache off. It is not
+# used with TAXONOMY_FILTER, whose output also depends on the taxonomy cache
+CONVERSION_CACHE_DIR = r"D:\webpage\conversion_cache"
+# Bump whenever a change to the converter changes its output, so earlier outputs are not reused
+CONVERTER_VERSION = "3"
+
+# Number of worker processes converting files in parallel; 1 converts in this process, one file at a time
+CONVERSION_WORKERS = os.cpu_count() or 1
+
+# Columns of the converted output, in order
+FACT_COLUMNS = [
+    'Company Code', 'Financial Year', 'Quarter', 'Element Name', 'Unit', 'Value', 'Decimal',
+    'Period Start Date', 'Period End Date', 'Nature Of Report',
+    'Context Start Date', 'Context End Date', 'Context Instant', 'Dimensions', 'Measure',
+    'Value Type', 'Numeric Value', 'Decimals',
+]
+
+# Columns that hold the same value on every row of a filing; kept once per file in tree mode
+HEADER_COLUMNS = ['Company Code', 'Financial Year', 'Quarter', 'Period Start Date', 'Period End Date', 'Nature Of Report']
+
+# Contexts and units are resolved once per document and looked up by each fact's contextRef/unitRef
+XBRLI_NS = "http://www.xbrl.org/2003/instance"
+XBRLI_CONTEXT = f"{{{XBRLI_NS}}}context"
+XBRLI_UNIT = f"{{{XBRLI_NS}}}unit"
+NO_CONTEXT = (None, None, None, None)
+
+# Elements the header fields of every row are taken from
+HEADER_ELEMENTS = {
+    "ScripCode", "DateOfEndOfFinancialYear", "DateOfStartOfReportingPeriod",
+    "DateOfEndOfReportingPeriod", "NatureOfReportStandaloneConsolidated",
+}
+
+# Drop comments (e.g. the FRIndAs marker) and processing instructions while parsing
+XML_PARSER = etree.XMLParser(remove_comments=True, remove_pis=True)
  
 def load_xml_lxml(file_path):
     """Load and parse the XML file using lxml."""
     try:
-        tree = etree.parse(file_path)
+        tree = etree.parse(file_path, XML_PARSER)
         root = tree.getroot()
         print(f"Root Element: {root.tag}")  # Debugging line
         return root
@@ -27,14 +85,32 @@ def load_xml_lxml(file_path):
         print(f"File not found: {e}")
         raise
  
-def extract_scrip_code_from_context(root):
+def index_elements(root):
+    """
+    Walk the tree once and return (elements, first_by_name): every element paired with its
+    local name in document order, and the first element seen for each local name.
+    """
+    localnames = {}  # Cache tag -> local name, most tags repeat many times in a filing
+    elements = []
+    first_by_name = {}
+    for elem in root.iter():
+        tag = elem.tag
+        localname = localnames.get(tag)
+        if localname is None:
+            localname = etree.QName(elem).localname  # Handle namespace if present
+            localnames[tag] = localname
+        elements.append((elem, localname))
+        first_by_name.setdefault(localname, elem)
+    return elements, first_by_name
+ 
+def extract_scrip_code_from_context(first_by_name):
     """Extract Scrip Code based on the Element Name 'ScripCode'."""
-    scrip_code_row = next((elem for elem in root.iter() if etree.QName(elem).localname == "ScripCode"), None)
+    scrip_code_row = first_by_name.get("ScripCode")
     return scrip_code_row.text.strip() if scrip_code_row is not None else 'Unknown'
  
-def extract_financial_year_from_context(root):
+def extract_financial_year_from_context(first_by_name):
     """Extract Financial Year based on the Element Name 'DateOfEndOfFinancialYear'."""
-    financial_year_row = next((elem for elem in root.iter() if etree.QName(elem).localname == "DateOfEndOfFinancialYear"), None)
+    financial_year_row = first_by_name.get("DateOfEndOfFinancialYear")
     if financial_year_row is not None:
         date_value = financial_year_row.text.strip()
         year = datetime.strptime(date_value, "%Y-%m-%d").year
@@ -42,10 +118,10 @@ def extract_financial_year_from_context(root):
     return 'Unknown'
  
         
-def extract_quarter_from_context(root):
+def extract_quarter_from_context(first_by_name):
     """Extract Quarter based on both 'DateOfStartOfReportingPeriod' and 'DateOfEndOfReportingPeriod'."""
-    start_date_row = next((elem for elem in root.iter() if etree.QName(elem).localname == "DateOfStartOfReportingPeriod"), None)
-    end_date_row = next((elem for elem in root.iter() if etree.QName(elem).localname == "DateOfEndOfReportingPeriod"), None)
+    start_date_row = first_by_name.get("DateOfStartOfReportingPeriod")
+    end_date_row = first_by_name.get("DateOfEndOfReportingPeriod")
    
     if start_date_row is not None and end_date_row is not None:
         start_date_value = start_date_row.text.strip()
@@ -76,18 +152,16 @@ def extract_quarter_from_context(root):
    
     raise ValueError("Missing required period start or end date in XML")
  
-def extract_all_data(root):
-    """Extract all data from the XML, including the new 'Nature Of Report' column."""
-    all_data = []
-   
+def extract_header(first_by_name):
+    """Return the fields repeated on every row, from the first element of each header name."""
     # Extract existing data (financial year, quarter)
-    scrip_code = extract_scrip_code_from_context(root)
-    financial_year = extract_financial_year_from_context(root)
-    quarter = extract_quarter_from_context(root)
+    scrip_code = extract_scrip_code_from_context(first_by_name)
+    financial_year = extract_financial_year_from_context(first_by_name)
+    quarter = extract_quarter_from_context(first_by_name)
  
     # Extract Period Start and Period End Dates from the XML
-    period_start_date_row = next((elem for elem in root.iter() if etree.QName(elem).localname == "DateOfStartOfReportingPeriod"), None)
-    period_end_date_row = next((elem for elem in root.iter() if etree.QName(elem).localname == "DateOfEndOfReportingPeriod"), None)
+    period_start_date_row = first_by_name.get("DateOfStartOfReportingPeriod")
+    period_end_date_row = first_by_name.get("DateOfEndOfReportingPeriod")
  
     # Set Period Start and Period End Dates, default to 'Unknown' if not found
     period_start_date = period_start_date_row.text.strip() if period_start_date_row is not None else 'Unknown'
@@ -95,104 +169,376 @@ def extract_all_data(root):
     
     # Extract the "Nature Of Report" from the element "NatureOfReporStandaloneConsolidated"
     nature_of_report = None
-    for elem in root.iter():
-        if etree.QName(elem).localname == "NatureOfReportStandaloneConsolidated":
-            nature_of_report = elem.text.strip() if elem.text else 'Unknown'
-            break
+    nature_of_report_row = first_by_name.get("NatureOfReportStandaloneConsolidated")
+    if nature_of_report_row is not None:
+        nature_of_report = nature_of_report_row.text.strip() if nature_of_report_row.text else 'Unknown'
 
-    # Iterate over all elements in the XML and extract necessary data
-    for elem in root.iter():
-        tag = etree.QName(elem).localname  # Handle namespace if present
-        value = elem.text.strip() if elem.text else None
+    return {
+        'Company Code': scrip_code,
+        'Financial Year': financial_year,
+        'Quarter': quarter,
+        'Period Start Date': period_start_date,
+        'Period End Date': period_end_date,
+        'Nature Of Report': nature_of_report,
+    }
+
+def context_details(context):
+    """Return (start date, end date, instant, dimensions) of an xbrli:context element."""
+    start_date = end_date = instant = None
+    dimensions = []
+    for child in context.iter():
+        localname = etree.QName(child).localname
+        if localname == 'startDate':
+            start_date = (child.text or '').strip()
+        elif localname == 'endDate':
+            end_date = (child.text or '').strip()
+        elif localname == 'instant':
+            instant = (child.text or '').strip()
+        elif localname in ('explicitMember', 'typedMember'):
+            member = ''.join(child.itertext()).strip()
+            dimensions.append(f"{child.get('dimension')}={member}")
+    return start_date, end_date, instant, '; '.join(dimensions) or None
+
+def unit_measure(unit):
+    """Return the measure of an xbrli:unit element, as numerator/denominator for divide units."""
+    def measures(parent):
+        if parent is None:
+            return ''
+        return '*'.join(measure.text.strip() for measure in parent.findall(f"{{{XBRLI_NS}}}measure") if measure.text)
+
+    divide = unit.find(f"{{{XBRLI_NS}}}divide")
+    if divide is not None:
+        numerator = measures(divide.find(f"{{{XBRLI_NS}}}unitNumerator"))
+        denominator = measures(divide.find(f"{{{XBRLI_NS}}}unitDenominator"))
+        return f"{numerator}/{denominator}"
+    return measures(unit)
+
+def index_contexts(elements):
+    """Return ({context id: context details}, {unit id: measure}) for a parsed document."""
+    contexts = {}
+    units = {}
+    for elem, _ in elements:
+        if elem.tag == XBRLI_CONTEXT:
+            contexts[elem.get('id')] = context_details(elem)
+        elif elem.tag == XBRLI_UNIT:
+            units[elem.get('id')] = unit_measure(elem)
+    return contexts, units
+
+def fact_record(header, tag, elem, contexts, units):
+    """Build the output row for one element."""
+    value = elem.text.strip() if elem.text else None
+    context_ref = elem.get('contextRef', 'OneD')  # Default to 'OneD' if contextRef is missing
+    decimals = elem.get('decimals', '')  # Include Decimals if present
+    fact_value = value
+    measure = units.get(elem.get('unitRef'))
+    value_type, numeric_value = classify_value(value, has_unit(measure, decimals))
+    # Looked up by the element's own contextRef: elements without one have no context, not OneD's
+    start_date, end_date, instant, dimensions = contexts.get(elem.get('contextRef'), NO_CONTEXT)
+
+    return {
+        'Company Code': header['Company Code'],
+        'Financial Year': header['Financial Year'],
+        'Quarter': header['Quarter'],
+        'Element Name': tag,
+        'Unit': context_ref,
+        'Value': fact_value,  # Include Decimals
+        'Decimal': decimals,  # Rename ContextRef to Unit
+        'Period Start Date': header['Period Start Date'],  # Add Period Start Date
+        'Period End Date': header['Period End Date'],      # Add Period End Date
+        'Nature Of Report': header['Nature Of Report'],  # Add Nature Of Report column
+        'Context Start Date': start_date,  # Period of this fact's own context
+        'Context End Date': end_date,
+        'Context Instant': instant,
+        'Dimensions': dimensions,
+        'Measure': measure,  # Measure of the fact's unitRef, e.g. iso4217:INR
+        'Value Type': value_type,  # numeric, date, boolean or text
+        'Numeric Value': numeric_value,
+        'Decimals': parse_decimals(decimals),  # None for INF
+    }
+
+_taxonomy_names = None
+
+def is_wanted(elem, tag):
+    """Apply FACTS_ONLY and TAXONOMY_FILTER to one element."""
+    global _taxonomy_names
+    context_ref = elem.get('contextRef')
+    if FACTS_ONLY and context_ref is None:
+        return False
+    if TAXONOMY_FILTER:
+        if _taxonomy_names is None:
+            _taxonomy_names = cached_taxonomy_names()  # Loaded once per process
+        if f"{context_ref or 'OneD'}-{tag}" not in _taxonomy_names:
+            return False
+    return True
+
+def extract_all_data(root):
+    """
+    Extract all data from the XML as (header, columns): the file-constant fields once, and one
+    list per remaining column with a value for each element. convert_to_dataframe expands it
+    and adds the typed value columns.
+    """
+    elements, first_by_name = index_elements(root)
+    header = extract_header(first_by_name)
+    contexts, units = index_contexts(elements)
+    if FACTS_ONLY or TAXONOMY_FILTER:
+        elements = [(elem, tag) for elem, tag in elements if is_wanted(elem, tag)]
+
+    columns = {column: [] for column in FACT_COLUMNS if column not in HEADER_COLUMNS and column not in TYPED_COLUMNS}
+    element_names = columns['Element Name']
+    context_refs = columns['Unit']
+    values = columns['Value']
+    decimals = columns['Decimal']
+    start_dates = columns['Context Start Date']
+    end_dates = columns['Context End Date']
+    instants = columns['Context Instant']
+    dimensions = columns['Dimensions']
+    measures = columns['Measure']
+
+    # Iterate over all elements in the XML and extract necessary data, as fact_record does
+    for elem, tag in elements:
         context_ref = elem.get('contextRef', 'OneD')  # Default to 'OneD' if contextRef is missing
-        decimals = elem.get('decimals', '')  # Include Decimals if present
-        fact_value = value
-        
-        all_data.append({
-            'Company Code': scrip_code,
-            'Financial Year': financial_year,
-            'Quarter': quarter,
-            'Element Name': tag,
-            'Unit': context_ref,
-            'Value': fact_value,  # Include Decimals
-            'Decimal': decimals,  # Rename ContextRef to Unit
-            'Period Start Date': period_start_date,  # Add Period Start Date
-            'Period End Date': period_end_date,      # Add Period End Date
-            'Nature Of Report': nature_of_report  # Add Nature Of Report column
-        })
-   
-    return all_data
+        start_date, end_date, instant, dimension = contexts.get(elem.get('contextRef'), NO_CONTEXT)
+        element_names.append(tag)
+        context_refs.append(context_ref)
+        values.append(elem.text.strip() if elem.text else None)
+        decimals.append(elem.get('decimals', ''))
+        start_dates.append(start_date)
+        end_dates.append(end_date)
+        instants.append(instant)
+        dimensions.append(dimension)
+        measures.append(units.get(elem.get('unitRef')))
+
+    return header, columns
+
+def release_element(elem):
+    """Free an element iterparse has finished with, along with its already processed siblings."""
+    elem.clear(keep_tail=True)
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+def read_document(file_path):
+    """
+    Stream the file once and return (header fields, contexts, units) for iter_facts.
+    Top-level elements are released as they end, so memory stays flat; contexts and units are
+    resolved before their children go.
+    """
+    localnames = {}
+    first_by_name = {}
+    contexts = {}
+    units = {}
+    for _, elem in etree.iterparse(file_path, events=("end",), remove_comments=True, remove_pis=True):
+        tag = elem.tag
+        localname = localnames.get(tag)
+        if localname is None:
+            localname = etree.QName(elem).localname  # Handle namespace if present
+            localnames[tag] = localname
+        if localname in HEADER_ELEMENTS and localname not in first_by_name:
+            first_by_name[localname] = copy.deepcopy(elem)  # Its text must outlive release_element
+
+        # Nested elements are freed with their top-level ancestor
+        parent = elem.getparent()
+        if parent is None or parent.getparent() is not None:
+            continue
+        if tag == XBRLI_CONTEXT:
+            contexts[elem.get('id')] = context_details(elem)
+        elif tag == XBRLI_UNIT:
+            units[elem.get('id')] = unit_measure(elem)
+        release_element(elem)
+    return extract_header(first_by_name), contexts, units
+
+def iter_facts(file_path, header, contexts, units):
+    """
+    Yield the same rows as extract_all_data, in document order, without holding the tree.
+    A row is emitted once the next parse event arrives, by which point the element's text is
+    complete, and each element is released as soon as it ends.
+    """
+    localnames = {}
+    filtered = FACTS_ONLY or TAXONOMY_FILTER
+    pending = None
+    for event, elem in etree.iterparse(file_path, events=("start", "end"), remove_comments=True, remove_pis=True):
+        if pending is not None:
+            tag = pending.tag
+            localname = localnames.get(tag)
+            if localname is None:
+                localname = etree.QName(pending).localname  # Handle namespace if present
+                localnames[tag] = localname
+            if not filtered or is_wanted(pending, localname):
+                yield fact_record(header, localname, pending, contexts, units)
+            pending = None
+
+        if event == "start":
+            pending = elem
+        else:
+            release_element(elem)
+
+def write_facts_to_excel(records, excel_path):
+    """Write rows to a write-only workbook one at a time and return the number written."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('All Data')
+    count = 0
+    for record in records:
+        if count == 0:
+            sheet.append(list(record.keys()))
+        sheet.append(list(record.values()))
+        count += 1
+    workbook.save(excel_path)
+    return count
 
  
+def fact_schema():
+    """Arrow schema of the Parquet output; columns are stored as text, as in the XML, except the typed values."""
+    import pyarrow as pa
+    typed = {'Numeric Value': pa.float64(), 'Decimals': pa.int16()}
+    return pa.schema([(column, typed.get(column, pa.string())) for column in FACT_COLUMNS])
+
+def write_facts_to_parquet(records, parquet_path):
+    """Write rows to a Parquet file in batches of PARQUET_BATCH_ROWS and return the number written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = fact_schema()
+    count = 0
+    with pq.ParquetWriter(parquet_path, schema) as writer:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= PARQUET_BATCH_ROWS:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch or count == 0:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+def output_path(excel_save_dir, new_file_name, financial_year):
+    """Return where a converted filing is written for the selected OUTPUT_FORMAT."""
+    if OUTPUT_FORMAT == "parquet":
+        year_folder = os.path.join(excel_save_dir, f"Financial Year={financial_year}")
+        os.makedirs(year_folder, exist_ok=True)
+        return os.path.join(year_folder, new_file_name.replace(".xlsx", ".parquet"))
+    return os.path.join(excel_save_dir, new_file_name)
+
+def constant_column(value, length):
+    """A categorical column holding one value on every row, stored as a single category."""
+    if value is None:
+        return pd.Categorical.from_codes(np.full(length, -1, dtype=np.int8), categories=[])
+    return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[value])
+
 def convert_to_dataframe(data):
-    """Convert extracted data to a pandas DataFrame."""
-    return pd.DataFrame(data)
- 
-def XML_edit(filepath):
-    """Edit XML to remove the specific comment line."""
-    file_path = filepath
-    print(file_path)
-    time.sleep(2)
-    with open(file_path, 'r', encoding='utf-8') as file:
-        xml_content = file.read()
-    root = ET.fromstring(xml_content)
-    for elem in root.iter():
-        if elem.tag == ET.Comment and elem.text.strip() == 'FRIndAs':
-            root.remove(elem)
-    tree = ET.ElementTree(root)
-    tree.write(file_path)
-    return file_path
-
-def process_xml_files(xml_download_dir, excel_save_dir, Processed_XMLs_folder, Stock_Symbol):
-    """Process all XML files in the XML download directory and save them to Excel.""" 
-    global log_df
+    """Convert extracted (header, columns) data to a pandas DataFrame."""
+    header, columns = data
+    length = len(columns['Element Name'])
+    frame = {}
+    for column in FACT_COLUMNS:
+        if column in HEADER_COLUMNS:
+            frame[column] = constant_column(header[column], length)
+        elif column not in TYPED_COLUMNS:
+            frame[column] = np.array(columns[column], dtype=object)
+    df = pd.DataFrame(frame)
+    df['Value Type'], df['Numeric Value'], df['Decimals'] = typed_values(df['Value'], df['Decimal'], df['Measure'])
+    return df[FACT_COLUMNS]
+ 
+def converter_settings():
+    """The part of the conversion cache key that is not the XML content."""
+    return f"{CONVERTER_VERSION};{OUTPUT_FORMAT};facts_only={FACTS_ONLY}"
+
+_conversion_cache = None
+
+def conversion_cache():
+    """Return this process's conversion cache, opened on first use, or None when it is off."""
+    global _conversion_cache
+    if CONVERSION_CACHE_DIR is None or TAXONOMY_FILTER:
+        return None
+    if _conversion_cache is None:
+        _conversion_cache = ConversionCache(CONVERSION_CACHE_DIR)
+    return _conversion_cache
+
+def convert_xml_file(file_path, excel_save_dir, Processed_XMLs_folder, Stock_Symbol):
+    """
+    Convert one XML file to Excel and move it to Processed_XMLs_folder. Returns the log record.
+    A file that fails stays where it is, so the next run picks it up again. A file converted
+    before (same bytes, same settings) gets the cached output instead of being parsed again.
+    """
+    file_name = os.path.basename(file_path)
+    print(f"Processing file: {file_path}")
+    started = time.perf_counter()
+    try:
+        cache = conversion_cache()
+        sha256 = file_sha256(file_path) if cache is not None else None
+        cached = cache.lookup(sha256, converter_settings()) if cache is not None else None
+        if cached is not None:
+            cached_path, period_start_date, period_end_date, financial_year = cached
+        elif PARSE_MODE == "stream":
+            header, contexts, units = read_document(file_path)
+            period_start_date = header['Period Start Date']
+            period_end_date = header['Period End Date']
+            financial_year = header['Financial Year']
+        else:
+            root = load_xml_lxml(file_path)
+            all_data = extract_all_data(root)
+            all_data_df = convert_to_dataframe(all_data)
+ 
+            # Extract Period Start Date and Period End Date for Excel file naming; every row carries
+            # them, so this also works when FACTS_ONLY or TAXONOMY_FILTER dropped the date elements
+            period_start_date = all_data_df['Period Start Date'].iloc[0] if not all_data_df.empty else 'UNKNOWN_START_DATE'
+            period_end_date = all_data_df['Period End Date'].iloc[0] if not all_data_df.empty else 'UNKNOWN_END_DATE'
+            financial_year = all_data_df['Financial Year'].iloc[0] if not all_data_df.empty else 'Unknown'
+ 
+        # Generate the Excel file name based on the Period Start Date or default to UNKNOWN
+        reporting_period_str = f"{period_start_date}_{period_end_date}"
+        base_file_name = file_name.replace(".xml", "")
+        new_file_name = f"{reporting_period_str}_{base_file_name}.xlsx"
+ 
+        # Write the data to Excel or Parquet
+        excel_path = output_path(excel_save_dir, new_file_name, financial_year)
+        if cached is not None:
+            link_or_copy(cached_path, excel_path)
+        elif PARSE_MODE == "stream" and OUTPUT_FORMAT == "parquet":
+            write_facts_to_parquet(iter_facts(file_path, header, contexts, units), excel_path)
+        elif PARSE_MODE == "stream":
+            write_facts_to_excel(iter_facts(file_path, header, contexts, units), excel_path)
+        elif OUTPUT_FORMAT == "parquet":
+            all_data_df.to_parquet(excel_path, index=False, schema=fact_schema())
+        else:
+            with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
+                all_data_df.to_excel(writer, sheet_name='All Data', index=False)
+        print(f"{'Reused cached' if cached is not None else 'Saved'} {OUTPUT_FORMAT} file: {excel_path}")
+        if cache is not None and cached is None:
+            cache.store(sha256, converter_settings(), excel_path, period_start_date, period_end_date, financial_year)
+ 
+        # Move the processed XML to another folder
+        destination_xml = os.path.join(Processed_XMLs_folder, file_name)
+        shutil.move(file_path, destination_xml)
+ 
+        # Log success
+        if cached is not None:
+            return {'Stock': str(Stock_Symbol), 'Period': str(file_name), 'Status': 'Cache Hit', 'Message': f'Identical filing converted before; reused {cached_path}.', 'Error Line': None,
+                    'Seconds': round(time.perf_counter() - started, 3)}
+        return {'Stock': str(Stock_Symbol), 'Period': str(file_name), 'Status': 'Success', 'Message': 'Processing completed successfully.', 'Error Line': None,
+                'Seconds': round(time.perf_counter() - started, 3)}
+ 
+    except Exception as e:
+        tb_str = traceback.format_exc()
+        error_line = 'Unknown'
+        for line in tb_str.splitlines():
+            if 'File' in line and ', line ' in line:
+                error_line = line.strip()
+                break
+        return {'Stock': str(Stock_Symbol), 'Period': str(file_name), 'Status': 'Error', 'Message': str(e), 'Error Line': error_line,
+                'Seconds': round(time.perf_counter() - started, 3)}
+
+def list_xml_files(xml_download_dir):
+    """Return the paths of all XML files under the XML download directory."""
+    xml_files = []
     for root_dir, _, files in os.walk(xml_download_dir):
         for file_name in files:
             if file_name.endswith(".xml"):
-                file_path = os.path.join(root_dir, file_name)
-                print(f"Processing file: {file_path}")
-                try:
-                    revised_file_path = XML_edit(file_path)  # Edit the XML file if needed
-                    root = load_xml_lxml(revised_file_path)
-                    all_data = extract_all_data(root)
-                    all_data_df = convert_to_dataframe(all_data)
- 
-                    # Extract Period Start Date and Period End Date for Excel file naming
-                    period_start_date_row = all_data_df[(all_data_df["Element Name"] == "DateOfStartOfReportingPeriod")]
-                    period_end_date_row = all_data_df[(all_data_df["Element Name"] == "DateOfEndOfReportingPeriod")] 
- 
-                    period_start_date = period_start_date_row["Value"].values[0] if not period_start_date_row.empty else 'UNKNOWN_START_DATE'
-                    period_end_date = period_end_date_row["Value"].values[0] if not period_end_date_row.empty else 'UNKNOWN_END_DATE'
- 
-                    # Generate the Excel file name based on the Period Start Date or default to UNKNOWN
-                    reporting_period_str = f"{period_start_date}_{period_end_date}"
-                    base_file_name = file_name.replace(".xml", "")
-                    new_file_name = f"{reporting_period_str}_{base_file_name}.xlsx"
- 
-                    # Write the data to Excel
-                    excel_path = os.path.join(excel_save_dir, new_file_name)
-                    with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-                        all_data_df.to_excel(writer, sheet_name='All Data', index=False)
-                    print(f"Saved Excel file: {excel_path}")
- 
-                    # Move the processed XML to another folder
-                    destination_xml = os.path.join(Processed_XMLs_folder, file_name)
-                    shutil.move(file_path, destination_xml)
- 
-                    # Log success
-                    log_entry = pd.DataFrame([{'Stock': str(Stock_Symbol), 'Period': str(file_name), 'Status': 'Success', 'Message': 'Processing completed successfully.', 'Error Line': None}])
-                    log_df = pd.concat([log_df, log_entry], ignore_index=True)
- 
-                except Exception as e:
-                    tb_str = traceback.format_exc()
-                    error_line = 'Unknown'
-                    for line in tb_str.splitlines():
-                        if 'File' in line and ', line ' in line:
-                            error_line = line.strip()
-                            break
-                    log_entry = pd.DataFrame([{'Stock': str(Stock_Symbol), 'Period': str(file_name), 'Status': 'Error', 'Message': str(e), 'Error Line': error_line}])
-                    log_df = pd.concat([log_df, log_entry], ignore_index=True)
- 
+                xml_files.append(os.path.join(root_dir, file_name))
+    return xml_files
+
 def replace_year_quarter_prefix(file_name, new_prefix):
     """Replace the 'YYYY-YYYY+1_QN' prefix in the file name with the new 'YYYYMM' prefix."""
     import re
@@ -206,34 +552,52 @@ xml_folder_path = Path(r"D:\webpage\xmls_processed")
 Input_File = (r"D:\webpage\Taxomy_LOS_For_Period 1_37.xlsx")  
 Log_Folder_Path = Path(r"D:\webpage\log")  # Log folder path
 
-# Create the log folder if it does not exist
-os.makedirs(Log_Folder_Path, exist_ok=True)
- 
-# Read the Excel file
-df = pd.read_excel(Input_File, sheet_name='Sheet1')
- 
-# Iterate over each stock and serial number from the input file
-for index, row in df.iterrows():
-    serial_number = str(row['Sr No'])  # Assuming column name for serial number is 'SerialNumber'
-    Name = str(row['Symbol'])
-    folder_name = f"{serial_number}_{Name}"  # Combine serial number and stock symbol
-    print(f"Looking for folder: {folder_name}")
- 
-    for current_folder in Input_Folder_path.iterdir():
-        if folder_name == str(os.path.basename(current_folder)):
-            current_folder_path = os.path.join(Input_Folder_path, current_folder)
-            print(f"Processing folder: {current_folder_path}")
-            xml_directory = current_folder_path
-            Processed_XMLs_folder_name = folder_name + "_XMLS_Processed"
-            Processed_XMLs_folder = os.path.join(xml_folder_path, Processed_XMLs_folder_name)
-            Converted_Excels_folder_name = folder_name + "_Converted_Excels"
-            Converted_Excels_folder = os.path.join(Output_Folder_Path, Converted_Excels_folder_name)
-            os.makedirs(Processed_XMLs_folder, exist_ok=True)
-            os.makedirs(Converted_Excels_folder, exist_ok=True)
-            process_xml_files(xml_directory, Converted_Excels_folder, Processed_XMLs_folder, current_folder)
-
-# Save the log data to an Excel file in the log folder
-log_file_name = "xml_to_excel_51_to_100_.xlsx"
-log_file_path = os.path.join(Log_Folder_Path, log_file_name)
-log_df.to_excel(log_file_path, index=False)
-print('Process complete. Log file saved to:', log_file_path)
+def main():
+    # Create the log folder if it does not exist
+    os.makedirs(Log_Folder_Path, exist_ok=True)
+
+    # Every file's result is appended to the journal as soon as it is known
+    log_file_name = "xml_to_excel_51_to_100_.xlsx"
+    journal = RunJournal(os.path.join(Log_Folder_Path, log_file_name.replace(".xlsx", ".jsonl")))
+
+    # Read the Excel file
+    df = pd.read_excel(Input_File, sheet_name='Sheet1')
+
+    # Scan the input tree once and match its files to the stocks of the input file
+    jobs = plan_jobs(df, scan_input_tree(Input_Folder_path))
+    print(f"Planned {len(jobs)} files in {jobs['Company Folder'].nunique()} company folders")
+
+    tasks = []
+    for folder_name, company_jobs in jobs.groupby('Company Folder', sort=False):
+        current_folder = Input_Folder_path / folder_name
+        print(f"Processing folder: {current_folder}")
+        Processed_XMLs_folder_name = folder_name + "_XMLS_Processed"
+        Processed_XMLs_folder = os.path.join(xml_folder_path, Processed_XMLs_folder_name)
+        Converted_Excels_folder_name = folder_name + "_Converted_Excels"
+        Converted_Excels_folder = os.path.join(Output_Folder_Path, Converted_Excels_folder_name)
+        os.makedirs(Processed_XMLs_folder, exist_ok=True)
+        os.makedirs(Converted_Excels_folder, exist_ok=True)
+        for file_path, size in zip(company_jobs['File Path'], company_jobs['Size']):
+            tasks.append((size, (file_path, Converted_Excels_folder, Processed_XMLs_folder, current_folder)))
+
+    if CONVERSION_WORKERS > 1 and tasks:
+        # Convert the files of every company together, largest first, so all workers stay busy
+        print(f"Converting {len(tasks)} files with {CONVERSION_WORKERS} worker processes")
+        tasks.sort(key=lambda task: task[0], reverse=True)
+        with ProcessPoolExecutor(max_workers=CONVERSION_WORKERS) as executor:
+            futures = [executor.submit(convert_xml_file, *task) for _, task in tasks]
+            for future in as_completed(futures):
+                journal.record(future.result())
+    else:
+        for _, task in tasks:
+            journal.record(convert_xml_file(*task))
+
+    # Export this run's journal to an Excel file in the log folder
+    log_file_path = os.path.join(Log_Folder_Path, log_file_name)
+    journal.export_excel(log_file_path, log_columns)
+    journal.close()
+    print('Process complete. Log file saved to:', log_file_path)
+
+
+if __name__ == "__main__":
+    main()
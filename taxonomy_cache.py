@@ -0,0 +1,66 @@
+import json
+import os
+import pandas as pd
+from sqlalchemy import text
+
+TAXONOMY_CACHE_PATH = r"D:\FinancialStatementAnalysis\01ETL\taxonomy_cache.feather"
+
+MAPPING_QUERY = """
+SELECT
+    "Unit-Element_Name",
+    "Taxonomy_id"
+FROM taxonomy_table;
+"""
+
+# Cheap enough to run on every start; any insert or delete changes the count or the max id
+FINGERPRINT_QUERY = 'SELECT COUNT(*), MAX("Taxonomy_id") FROM taxonomy_table'
+
+
+def table_fingerprint(engine):
+    """Return [row count, max Taxonomy_id] of taxonomy_table as strings."""
+    with engine.connect() as connection:
+        row_count, max_id = connection.execute(text(FINGERPRINT_QUERY)).one()
+    return [str(row_count), str(max_id)]
+
+
+def load_taxonomy_mapping(engine, cache_path=TAXONOMY_CACHE_PATH):
+    """
+    Return the Unit-Element_Name -> Taxonomy_id mapping, read from the local Feather cache when
+    taxonomy_table has not changed since it was written, otherwise downloaded and cached again.
+    """
+    fingerprint_path = cache_path + ".json"
+    fingerprint = table_fingerprint(engine)
+
+    if os.path.exists(cache_path) and os.path.exists(fingerprint_path):
+        with open(fingerprint_path) as file:
+            if json.load(file) == fingerprint:
+                print("Taxonomy mapping unchanged; using the local cache.")
+                return pd.read_feather(cache_path)
+
+    master_mapping = pd.read_sql(MAPPING_QUERY, engine)
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    master_mapping.to_feather(cache_path)
+    with open(fingerprint_path, "w") as file:
+        json.dump(fingerprint, file)
+    print(f"Taxonomy mapping downloaded and cached ({len(master_mapping)} rows).")
+    return master_mapping
+
+
+def cached_taxonomy_names(cache_path=TAXONOMY_CACHE_PATH):
+    """Return the set of Unit-Element_Name values in the local cache, without contacting the database."""
+    if not os.path.exists(cache_path):
+        raise FileNotFoundError(f"No taxonomy cache at {cache_path}; run the loader once to create it")
+    return set(pd.read_feather(cache_path, columns=['Unit-Element_Name'])['Unit-Element_Name'])
+
+
+def taxonomy_lookup(master_mapping):
+    """Build the dict used to map facts; the first Taxonomy_id listed for a name wins."""
+    unique_mapping = master_mapping.drop_duplicates(subset='Unit-Element_Name', keep='first')
+    return dict(zip(unique_mapping['Unit-Element_Name'], unique_mapping['Taxonomy_id']))
+
+
+def map_taxonomy(data, lookup):
+    """Add the Taxonomy_id column to a frame of facts with one hash lookup per row."""
+    data = data.copy()
+    data['Taxonomy_id'] = data['Unit-Element_Name'].map(lookup)
+    return data
@@ -0,0 +1,142 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bse_client import NoResultsError, ResultsClient  # noqa: E402
+
+# A stand-in for Comp_Resultsnew.aspx: the search form with its view state, the hidden scrip code
+# field the suggestion list fills in, and a results grid. The landing page lists another company's
+# results, and a postback the page does not accept is answered with the landing page again, the
+# way an ignored ASP.NET postback looks.
+
+OTHER_CODE = "999999"
+
+
+def results_row(security_code):
+    return (
+        f"<tr><td>{security_code}</td><td>Company {security_code}</td><td>Q</td><td>Jun-24</td><td>-</td>"
+        f"<td><a href='/xbrl/{security_code}_s.xml'>XBRL</a></td><td><a href='/xbrl/{security_code}_c.xml'>XBRL</a></td></tr>"
+    )
+
+
+def results_page(view_state, hidden_field_id, security_code):
+    return f"""
+    <html><body><form method="post" action="./Comp_Resultsnew.aspx" id="form1">
+      <input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{view_state}" />
+      <input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="ev" />
+      <input type="text" name="ctl00$ContentPlaceHolder1$SmartSearch$smartSearch"
+             id="ContentPlaceHolder1_SmartSearch_smartSearch" value="" />
+      <input type="hidden" name="ctl00$ContentPlaceHolder1${hidden_field_id}"
+             id="ContentPlaceHolder1_{hidden_field_id}" value="" />
+      <select name="ctl00$ContentPlaceHolder1$broadcastdd" id="ContentPlaceHolder1_broadcastdd">
+        <option value="1" selected="selected">Last 1 day</option><option value="7">Last 1 week</option>
+      </select>
+      <input type="submit" name="ctl00$ContentPlaceHolder1$btnSubmit" id="ContentPlaceHolder1_btnSubmit" value="Submit" />
+      <input type="submit" name="ctl00$ContentPlaceHolder1$btnReset" id="ContentPlaceHolder1_btnReset" value="Reset" />
+      <table id="ContentPlaceHolder1_gvData">{results_row(security_code)}</table>
+    </form></body></html>
+    """
+
+
+class FormServer(ThreadingHTTPServer):
+    def __init__(self, hidden_field_id="hdnCode", single_use_view_state=False):
+        super().__init__(("127.0.0.1", 0), FormHandler)
+        self.hidden_field_id = hidden_field_id
+        self.single_use_view_state = single_use_view_state
+        self.view_states = set()
+        self.page_loads = 0
+        self.lock = threading.Lock()
+
+    def new_view_state(self):
+        with self.lock:
+            self.page_loads += 1
+            view_state = f"vs{self.page_loads}"
+            self.view_states.add(view_state)
+        return view_state
+
+
+class FormHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def send_page(self, page):
+        body = page.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        self.send_page(results_page(server.new_view_state(), server.hidden_field_id, OTHER_CODE))
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers["Content-Length"])
+        fields = {name: values[0] for name, values in parse_qs(self.rfile.read(length).decode(), keep_blank_values=True).items()}
+
+        with server.lock:
+            view_state = fields.get("__VIEWSTATE")
+            accepted = view_state in server.view_states
+            if accepted and server.single_use_view_state:
+                server.view_states.discard(view_state)
+
+        security_code = fields.get(f"ctl00$ContentPlaceHolder1${server.hidden_field_id}", "")
+        submitted = "ctl00$ContentPlaceHolder1$btnSubmit" in fields and "ctl00$ContentPlaceHolder1$btnReset" not in fields
+        if accepted and submitted and security_code:
+            self.send_page(results_page(server.new_view_state(), server.hidden_field_id, security_code))
+        else:
+            self.send_page(results_page(server.new_view_state(), server.hidden_field_id, OTHER_CODE))
+
+
+@pytest.fixture
+def form_server(request):
+    server = FormServer(**getattr(request, "param", {}))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def results_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/Comp_Resultsnew.aspx"
+
+
+def test_lookup_returns_the_grid_of_the_requested_code(form_server):
+    client = ResultsClient(url=results_url(form_server), timeout=5)
+    try:
+        page_source, _ = client.lookup("500325")
+        assert "/xbrl/500325_s.xml" in page_source
+        client.lookup("532540")
+    finally:
+        client.close()
+    assert form_server.page_loads == 3  # One form load, then one postback per lookup
+
+
+@pytest.mark.parametrize("form_server", [{"hidden_field_id": "hdnScripCode"}], indirect=True)
+def test_ignored_postback_is_not_taken_for_results(form_server):
+    client = ResultsClient(url=results_url(form_server), timeout=5)
+    try:
+        with pytest.raises(NoResultsError):
+            client.lookup("500325")
+    finally:
+        client.close()
+
+
+@pytest.mark.parametrize("form_server", [{"single_use_view_state": True}], indirect=True)
+def test_expired_view_state_is_refreshed(form_server):
+    client = ResultsClient(url=results_url(form_server), timeout=5)
+    try:
+        client.lookup("500325")
+        page_source, _ = client.lookup("532540")
+        assert "/xbrl/532540_s.xml" in page_source
+    finally:
+        client.close()
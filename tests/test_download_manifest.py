@@ -0,0 +1,50 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from download_manifest import DownloadManifest  # noqa: E402
+
+FILING = '<?xml version="1.0"?>\n<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance"></xbrli:xbrl>\n'
+
+
+def saved_file(tmp_path, name, content):
+    file_path = tmp_path / name
+    file_path.write_text(content, encoding="utf-8")
+    return str(file_path)
+
+
+def test_moved_filing_stays_fetched_until_forgotten(tmp_path):
+    manifest = DownloadManifest(str(tmp_path / "manifest.sqlite"))
+    try:
+        file_path = saved_file(tmp_path, "a.xml", FILING)
+        assert manifest.record("500325", "Standalone", "Jun-24", "http://x/a.xml", file_path)
+        os.remove(file_path)  # Moved on by the converter
+        assert manifest.is_fetched("500325", "Standalone", "Jun-24", "http://x/a.xml")
+
+        assert manifest.forget("500325", "Consolidated") == 0
+        assert manifest.forget("500325", "Standalone", "Jun-24") == 1
+        assert not manifest.is_fetched("500325", "Standalone", "Jun-24", "http://x/a.xml")
+    finally:
+        manifest.close()
+
+
+def test_error_page_is_not_recorded(tmp_path):
+    manifest = DownloadManifest(str(tmp_path / "manifest.sqlite"))
+    try:
+        file_path = saved_file(tmp_path, "a.xml", "<html><body>Access Denied</body></html>")
+        assert not manifest.record("500325", "Standalone", "Jun-24", "http://x/a.xml", file_path)
+        assert not manifest.is_fetched("500325", "Standalone", "Jun-24", "http://x/a.xml")
+    finally:
+        manifest.close()
+
+
+def test_damaged_file_is_fetched_again(tmp_path):
+    manifest = DownloadManifest(str(tmp_path / "manifest.sqlite"))
+    try:
+        file_path = saved_file(tmp_path, "a.xml", FILING)
+        manifest.record("500325", "Standalone", "Jun-24", "http://x/a.xml", file_path)
+        saved_file(tmp_path, "a.xml", FILING.replace("xbrl>", "xbrl> "))
+        assert not manifest.is_fetched("500325", "Standalone", "Jun-24", "http://x/a.xml")
+    finally:
+        manifest.close()
@@ -0,0 +1,97 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fact_values import classify_value, has_unit, parse_decimals, typed_values  # noqa: E402
+import standalone_xml_to_excel as converter  # noqa: E402
+
+# (value, decimals, unit measure) -> (value type, numeric value, decimals) of one fact
+CASES = [
+    (("500325", "", None), ("text", None, None)),  # Scrip code: digits without a unit
+    (("02227212345", "", None), ("text", None, None)),  # Phone number keeps its leading zero
+    (("1000", "-5", "iso4217:INR"), ("numeric", 1000.0, -5)),
+    (("123456789.50", "INF", "iso4217:INR"), ("numeric", 123456789.5, None)),  # Exact: no decimals
+    (("4.25", "2", "iso4217:INR/xbrli:shares"), ("numeric", 4.25, 2)),  # Divide unit, e.g. EPS
+    (("-7", "0", "xbrli:pure"), ("numeric", -7.0, 0)),
+    (("12", "", "xbrli:shares"), ("numeric", 12.0, None)),  # Unit without decimals
+    (("Lakhs", "", None), ("text", None, None)),
+    (("NA", "-5", "iso4217:INR"), ("text", None, -5)),  # Not a number, whatever its unit says
+    (("2024-03-31", "", None), ("date", None, None)),
+    (("true", "", None), ("boolean", None, None)),
+    (("false", "", None), ("boolean", None, None)),
+    ((None, "", None), (None, None, None)),
+]
+
+
+@pytest.mark.parametrize("fact, expected", CASES)
+def test_classify_value(fact, expected):
+    value, decimals, measure = fact
+    value_type, numeric_value = classify_value(value, has_unit(measure, decimals))
+    assert (value_type, numeric_value, parse_decimals(decimals)) == expected
+
+
+def test_typed_values_agrees_with_classify_value():
+    facts = pd.DataFrame([fact for fact, _ in CASES], columns=["Value", "Decimal", "Measure"]).astype(object)
+    value_types, numeric_values, decimals = typed_values(facts["Value"], facts["Decimal"], facts["Measure"])
+
+    vectorized = [
+        (value_type, None if pd.isna(number) else number, None if pd.isna(places) else int(places))
+        for value_type, number, places in zip(value_types, numeric_values, decimals)
+    ]
+    assert vectorized == [expected for _, expected in CASES]
+
+
+def test_files_without_measure_are_classified_by_decimals():
+    # Files converted before the Measure column existed load with it empty
+    values = pd.Series(["500325", "1000", "1000"], dtype=object)
+    decimals = pd.Series([None, "-5", "INF"], dtype=object)
+    value_types, _, _ = typed_values(values, decimals, pd.Series([None] * 3, dtype=object))
+    assert list(value_types) == ["text", "numeric", "numeric"]
+
+
+FILING = """<?xml version="1.0"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:iso4217="http://www.xbrl.org/2003/iso4217"
+            xmlns:in-bse-fin="http://bse/fin">
+  <xbrli:context id="OneD"><xbrli:period><xbrli:startDate>2023-04-01</xbrli:startDate>
+    <xbrli:endDate>2023-06-30</xbrli:endDate></xbrli:period></xbrli:context>
+  <xbrli:unit id="INR"><xbrli:measure>iso4217:INR</xbrli:measure></xbrli:unit>
+  <xbrli:unit id="INRPerShare"><xbrli:divide>
+    <xbrli:unitNumerator><xbrli:measure>iso4217:INR</xbrli:measure></xbrli:unitNumerator>
+    <xbrli:unitDenominator><xbrli:measure>xbrli:shares</xbrli:measure></xbrli:unitDenominator>
+  </xbrli:divide></xbrli:unit>
+  <in-bse-fin:ScripCode contextRef="OneD">500325</in-bse-fin:ScripCode>
+  <in-bse-fin:DateOfStartOfReportingPeriod contextRef="OneD">2023-04-01</in-bse-fin:DateOfStartOfReportingPeriod>
+  <in-bse-fin:DateOfEndOfReportingPeriod contextRef="OneD">2023-06-30</in-bse-fin:DateOfEndOfReportingPeriod>
+  <in-bse-fin:TelephoneNumber contextRef="OneD">02227212345</in-bse-fin:TelephoneNumber>
+  <in-bse-fin:WhetherResultsAreAudited contextRef="OneD">false</in-bse-fin:WhetherResultsAreAudited>
+  <in-bse-fin:RevenueFromOperations contextRef="OneD" unitRef="INR" decimals="INF">1234567</in-bse-fin:RevenueFromOperations>
+  <in-bse-fin:BasicEarningsLossPerShare contextRef="OneD" unitRef="INRPerShare" decimals="2">4.25</in-bse-fin:BasicEarningsLossPerShare>
+</xbrli:xbrl>
+"""
+
+
+def test_converter_types_facts_by_unit(tmp_path):
+    file_path = tmp_path / "filing.xml"
+    file_path.write_text(FILING, encoding="utf-8")
+
+    header, contexts, units = converter.read_document(str(file_path))
+    streamed = pd.DataFrame(list(converter.iter_facts(str(file_path), header, contexts, units)))
+    in_memory = converter.convert_to_dataframe(converter.extract_all_data(etree.parse(str(file_path)).getroot()))
+
+    for facts in (streamed, in_memory):
+        facts = facts.set_index("Element Name")
+        assert facts.loc["ScripCode", "Value Type"] == "text"
+        assert facts.loc["TelephoneNumber", "Value Type"] == "text"
+        assert facts.loc["TelephoneNumber", "Value"] == "02227212345"
+        assert facts.loc["WhetherResultsAreAudited", "Value Type"] == "boolean"
+        assert facts.loc["DateOfStartOfReportingPeriod", "Value Type"] == "date"
+        assert facts.loc["RevenueFromOperations", ["Value Type", "Numeric Value", "Value"]].tolist() == ["numeric", 1234567.0, "1234567"]
+        assert pd.isna(facts.loc["RevenueFromOperations", "Decimals"])
+        assert facts.loc["BasicEarningsLossPerShare", ["Value Type", "Numeric Value", "Measure"]].tolist() == [
+            "numeric", 4.25, "iso4217:INR/xbrli:shares"
+        ]
@@ -0,0 +1,73 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetch_engine import run_downloads  # noqa: E402
+
+# A stand-in for the XBRL file host: a filing, an HTML page served with status 200 the way an error
+# or block page is, and a missing file
+
+FILING = b'<?xml version="1.0" encoding="utf-8"?>\n<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance"></xbrli:xbrl>\n'
+BLOCK_PAGE = b"<html><body><h1>Access Denied</h1></body></html>"
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        pages = {"/filing.xml": (FILING, "text/xml"), "/blocked.xml": (BLOCK_PAGE, "text/html")}
+        if self.path not in pages:
+            self.send_error(404)
+            return
+        body, content_type = pages[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def file_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FileHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def download(server, tmp_path, name):
+    url = f"http://127.0.0.1:{server.server_address[1]}/{name}"
+    file_path = str(tmp_path / name)
+    [result] = run_downloads([("500325", "Jun-24", url, file_path)], report_every=60)
+    return result, file_path
+
+
+def test_filing_is_saved(file_server, tmp_path):
+    result, file_path = download(file_server, tmp_path, "filing.xml")
+    assert result["Status"] == "Success"
+    with open(file_path, "rb") as file:
+        assert file.read() == FILING
+
+
+def test_html_page_is_not_saved_as_a_filing(file_server, tmp_path):
+    result, file_path = download(file_server, tmp_path, "blocked.xml")
+    assert result["Status"] == "Not XBRL"
+    assert os.listdir(tmp_path) == []
+
+
+def test_missing_file_is_not_retried(file_server, tmp_path):
+    result, _ = download(file_server, tmp_path, "missing.xml")
+    assert result["Status"] == "File not saved"
+    assert "404" in result["Error"]
+    assert result["Seconds"] is not None  # Logged for failed files too
+    assert file_server.requests == ["/missing.xml"]
@@ -0,0 +1,125 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetch_engine import run_downloads  # noqa: E402
+from xbrl_http import STANDALONE_XBRL_COLUMN, CONSOLIDATED_XBRL_COLUMN, create_session, grid_rows, xbrl_links  # noqa: E402
+
+# A stand-in for the results page and the XBRL file host. The grid links files with a relative, a
+# root-relative and an absolute href, and has rows without a link, with a javascript: link and of
+# another company, the way the real grid does
+
+SECURITY_CODE = "500325"
+
+
+def filing(period):
+    # Non-ASCII text and CRLF line ends, so any re-encoding or newline translation shows up
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\r\n'
+        '<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance">\r\n'
+        f'  <Period>{period}</Period><Note>Rs. ₹ crore</Note>\r\n'
+        '</xbrli:xbrl>\r\n'
+    ).encode("utf-8")
+
+
+FILES = {
+    "/xbrl/files/Jun-24_s.xml": filing("Jun-24"),
+    "/xbrl/Mar-24_s.xml": filing("Mar-24"),
+    "/other/Dec-23_s.xml": filing("Dec-23"),
+    "/xbrl/files/Jun-24_c.xml": filing("Jun-24 consolidated"),
+}
+
+
+def grid_row(security_code, period, standalone_cell, consolidated_cell="<td>-</td>"):
+    return (
+        f"<tr><td>{security_code}</td><td>Company</td><td>Q</td><td>{period}</td><td>-</td>"
+        f"{standalone_cell}{consolidated_cell}</tr>"
+    )
+
+
+def grid_page(base_url):
+    rows = [
+        "<tr><th>Security Code</th><th>Company</th></tr>",
+        grid_row(SECURITY_CODE, "Jun-24", "<td><a href='files/Jun-24_s.xml'>XBRL</a></td>",
+                 "<td><a href='files/Jun-24_c.xml'>XBRL</a></td>"),
+        grid_row(SECURITY_CODE, "Mar-24", "<td><a href=' /xbrl/Mar-24_s.xml '>XBRL</a></td>"),
+        grid_row(SECURITY_CODE, "Dec-23", f"<td><a href='{base_url}/other/Dec-23_s.xml'>XBRL</a></td>"),
+        grid_row(SECURITY_CODE, "Sep-23", "<td>-</td>"),
+        grid_row(SECURITY_CODE, "Jun-23", "<td><a href=\"JavaScript:__doPostBack('gvData','Select$5')\">XBRL</a></td>"),
+        grid_row("999999", "Jun-24", "<td><a href='files/999999_s.xml'>XBRL</a></td>"),
+    ]
+    return f"<html><body><table id='ContentPlaceHolder1_gvData'>{''.join(rows)}</table></body></html>".encode()
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/xbrl/Results.aspx":
+            body, content_type = grid_page(self.server.base_url), "text/html; charset=utf-8"
+        elif self.path in FILES:
+            body, content_type = FILES[self.path], "text/xml"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fetch_grid(site):
+    session = create_session(pool_size=2)
+    try:
+        response = session.get(f"{site.base_url}/xbrl/Results.aspx", timeout=5)
+        response.raise_for_status()
+        return grid_rows(response.text, response.url)
+    finally:
+        session.close()
+
+
+def test_links_are_resolved_against_the_page(site):
+    links = xbrl_links(fetch_grid(site), SECURITY_CODE, STANDALONE_XBRL_COLUMN)
+    assert links == [
+        ("Jun-24", f"{site.base_url}/xbrl/files/Jun-24_s.xml"),
+        ("Mar-24", f"{site.base_url}/xbrl/Mar-24_s.xml"),
+        ("Dec-23", f"{site.base_url}/other/Dec-23_s.xml"),
+        ("Sep-23", None),  # No link in the cell
+        ("Jun-23", None),  # javascript: postback, not a file
+    ]
+    assert xbrl_links(fetch_grid(site), SECURITY_CODE, CONSOLIDATED_XBRL_COLUMN)[0] == (
+        "Jun-24", f"{site.base_url}/xbrl/files/Jun-24_c.xml"
+    )
+
+
+def test_downloaded_files_match_the_served_bytes(site, tmp_path):
+    links = [(period, url) for period, url in xbrl_links(fetch_grid(site), SECURITY_CODE, STANDALONE_XBRL_COLUMN) if url]
+    jobs = [("Company", period, url, str(tmp_path / f"Company_{period}.xml")) for period, url in links]
+
+    results = run_downloads(jobs, concurrency=2, rate_per_host=50, report_every=60)
+
+    assert [result["Status"] for result in results] == ["Success"] * len(jobs)
+    for (_, url), (_, _, _, file_path), result in zip(links, jobs, results):
+        served = FILES[url[len(site.base_url):]]
+        with open(file_path, "rb") as file:
+            assert file.read() == served
+        assert result["Bytes"] == len(served)
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(job[3]) for job in jobs)  # No .part files left
@@ -0,0 +1,38 @@
+import os
+import pandas as pd
+
+# Plan a conversion run from one scan of the input tree: every file under every company folder is
+# listed once, with its size and modification time, and matched to the rows of the input sheet
+# in memory instead of listing the input folder again for each row.
+
+MANIFEST_COLUMNS = ['Company Folder', 'File Path', 'Size', 'Modified']
+
+
+def scan_input_tree(input_folder, extension=".xml"):
+    """Return the manifest of every file with the given extension under the company folders of input_folder."""
+    rows = []
+    with os.scandir(input_folder) as company_folders:
+        for company_folder in company_folders:
+            if not company_folder.is_dir():
+                continue
+            for root_dir, _, files in os.walk(company_folder.path):
+                for file_name in files:
+                    if file_name.endswith(extension):
+                        file_path = os.path.join(root_dir, file_name)
+                        stat = os.stat(file_path)
+                        rows.append((company_folder.name, file_path, stat.st_size, stat.st_mtime))
+    return pd.DataFrame(rows, columns=MANIFEST_COLUMNS)
+
+
+def plan_jobs(input_sheet, manifest):
+    """
+    Join the manifest to the input sheet on the "<Sr No>_<Symbol>" folder name and return one row
+    per file to convert, in sheet order. Sheet rows without a folder are reported and skipped.
+    """
+    companies = pd.DataFrame({
+        'Company Folder': input_sheet['Sr No'].astype(str) + "_" + input_sheet['Symbol'].astype(str)
+    }).drop_duplicates()
+    found = companies['Company Folder'].isin(manifest['Company Folder'])
+    for folder_name in companies.loc[~found, 'Company Folder']:
+        print(f"No folder found for: {folder_name}")
+    return companies.merge(manifest, on='Company Folder', how='inner')
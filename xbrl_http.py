@@ -0,0 +1,76 @@
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html
+
+# BSE rejects requests that do not look like they come from a browser
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Zero-based cell positions in a ContentPlaceHolder1_gvData row
+SECURITY_CODE_COLUMN = 0
+PERIOD_COLUMN = 3
+STANDALONE_XBRL_COLUMN = 5
+CONSOLIDATED_XBRL_COLUMN = 6
+
+
+def create_session(pool_size=10, user_agent=DEFAULT_USER_AGENT):
+    """Create a keep-alive HTTP session whose connection pool is shared by all worker threads."""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": user_agent})
+    return session
+
+
+def is_xbrl_document(file_path):
+    """
+    True if the file parses as XML up to an xbrl root element. Only the start of the document is
+    read, so an HTML error or block page served with status 200 is told apart from a filing cheaply.
+    """
+    with open(file_path, "rb") as file:
+        try:
+            _, root = next(etree.iterparse(file, events=("start",), resolve_entities=False, no_network=True))
+        except (etree.XMLSyntaxError, StopIteration):
+            return False
+    return etree.QName(root).localname == "xbrl"
+
+
+def grid_rows(page_source, page_url, grid_id="ContentPlaceHolder1_gvData"):
+    """
+    Parse the results grid once and return one list of (text, href) cells per row.
+    Relative hrefs are resolved against page_url; cells without a usable link have href None.
+    """
+    tree = html.fromstring(page_source)
+    rows = []
+    for tr in tree.xpath(f"//*[@id='{grid_id}']//tr"):
+        cells = []
+        for td in tr.xpath("./td"):
+            text = td.text_content().strip()
+            href = None
+            anchors = td.xpath(".//a[@href]")
+            if anchors:
+                raw_href = anchors[0].get("href").strip()
+                if raw_href and not raw_href.lower().startswith("javascript:"):
+                    href = urljoin(page_url, raw_href)
+            cells.append((text, href))
+        if cells:
+            rows.append(cells)
+    return rows
+
+
+def xbrl_links(rows, security_code, link_column, name_column=PERIOD_COLUMN):
+    """Return (period, url) pairs for the given security code from parsed grid rows."""
+    links = []
+    for cells in rows:
+        if len(cells) <= max(link_column, name_column):
+            continue
+        if cells[SECURITY_CODE_COLUMN][0] != str(security_code):
+            continue
+        links.append((cells[name_column][0], cells[link_column][1]))
+    return links
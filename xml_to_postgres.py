@@ -0,0 +1,171 @@
+import os
+import shutil
+import time
+import traceback
+from pathlib import Path
+import pandas as pd
+from sqlalchemy import create_engine
+from standalone_xml_to_excel import read_document, iter_facts, list_xml_files, write_facts_to_excel
+from taxonomy_cache import map_taxonomy, taxonomy_lookup
+from run_journal import RunJournal
+from load_excel_to_table import (
+    DATABASE_URI, LOAD_METHOD, OUTPUT_COLUMNS, RELEVANT_KEYWORDS, clean_facts, column_types, copy_rows,
+    load_master_mapping, prepare_output_tables, upsert_rows, validate_columns
+)
+
+# Load XBRL filings straight into PostgreSQL: facts are streamed out of each XML file, cleaned and
+# mapped to taxonomy ids like load_excel_to_table does, and inserted in batches, without the
+# intermediate Excel files
+
+Input_Folder_path = Path(r"D:\webpage\xml_excel")  # Company folders named "<Sr No>_<Symbol>"
+xml_folder_path = Path(r"D:\webpage\xmls_processed")  # Loaded XMLs are moved here
+Audit_Folder_Path = Path(r"D:\webpage\converted")  # Audit Excel files, when enabled
+Log_Folder_Path = Path(r"D:\webpage\log")
+
+OUTPUT_TABLE_NAME = 'taxonomy_output'
+BATCH_ROWS = 20000  # Facts per insert; bounds memory whatever the filing size
+
+# Also write the converted Excel file of every filing, for auditing
+WRITE_AUDIT_EXCEL = False
+
+LOG_COLUMNS = ['Stock', 'Period', 'Status', 'Message', 'Error Line', 'Seconds']
+
+
+def relevant_facts(records):
+    """
+    Skip the rows before the first ScripCode/Symbol/ISIN element, like process_excel does.
+    Rows are held back until that element shows up and are all kept if it never does.
+    """
+    held_back = []
+    records = iter(records)
+    for record in records:
+        if any(keyword in str(record['Element Name']) for keyword in RELEVANT_KEYWORDS):
+            yield record
+            yield from records
+            return
+        held_back.append(record)
+    yield from held_back
+
+
+def fact_batches(records, batch_rows):
+    """Group records into DataFrames of at most batch_rows rows."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_rows:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch)
+
+
+def load_xml_file(connection, file_path, lookup, company_folder_name, missing_taxonomy_log):
+    """Insert every fact of one filing through the open connection and return the row count."""
+    header, contexts, units = read_document(file_path)
+    records = relevant_facts(iter_facts(file_path, header, contexts, units))
+
+    row_count = 0
+    for batch in fact_batches(records, BATCH_ROWS):
+        batch = clean_facts(batch)
+        if batch.empty:
+            continue
+
+        # Map to taxonomy ids and log the elements that have none
+        merged_data = map_taxonomy(batch, lookup)
+        for unit_element_name in merged_data.loc[merged_data['Taxonomy_id'].isna(), 'Unit-Element_Name']:
+            missing_taxonomy_log.append({'Company': company_folder_name, 'Unit-Element_Name': unit_element_name})
+
+        merged_data = validate_columns(merged_data, OUTPUT_COLUMNS)[OUTPUT_COLUMNS]
+        if LOAD_METHOD == "upsert":
+            upsert_rows(connection.connection, merged_data, OUTPUT_TABLE_NAME)
+        elif LOAD_METHOD == "copy":
+            copy_rows(connection.connection, merged_data, OUTPUT_TABLE_NAME)
+        else:
+            merged_data.to_sql(OUTPUT_TABLE_NAME, connection, index=False, if_exists='append', dtype=column_types(merged_data))
+        row_count += len(merged_data)
+
+    return (header, contexts, units), row_count
+
+
+def load_company_folder(engine, company_folder_path, lookup, missing_taxonomy_log, journal):
+    """Load every XML file of one company; each file is inserted in its own transaction."""
+    company_folder_name = os.path.basename(company_folder_path)
+    Processed_XMLs_folder = os.path.join(xml_folder_path, company_folder_name + "_XMLS_Processed")
+    os.makedirs(Processed_XMLs_folder, exist_ok=True)
+
+    for file_path in list_xml_files(company_folder_path):
+        file_name = os.path.basename(file_path)
+        print(f"Loading file: {file_path}")
+        started = time.perf_counter()
+        try:
+            # A failed filing rolls back completely and stays in place for the next run
+            file_missing_taxonomy = []
+            with engine.begin() as connection:
+                document, row_count = load_xml_file(
+                    connection, file_path, lookup, company_folder_name, file_missing_taxonomy
+                )
+            missing_taxonomy_log.extend(file_missing_taxonomy)
+
+            if WRITE_AUDIT_EXCEL:
+                audit_folder = os.path.join(Audit_Folder_Path, company_folder_name + "_Converted_Excels")
+                os.makedirs(audit_folder, exist_ok=True)
+                header, contexts, units = document
+                audit_name = f"{header['Period Start Date']}_{header['Period End Date']}_{file_name.replace('.xml', '')}.xlsx"
+                write_facts_to_excel(iter_facts(file_path, header, contexts, units), os.path.join(audit_folder, audit_name))
+
+            shutil.move(file_path, os.path.join(Processed_XMLs_folder, file_name))
+            print(f"Inserted {row_count} rows from {file_name}")
+            journal.record(dict(zip(LOG_COLUMNS, [
+                company_folder_name, file_name, 'Success', f'{row_count} rows inserted.', None,
+                round(time.perf_counter() - started, 3)
+            ])))
+
+        except Exception as e:
+            tb_str = traceback.format_exc()
+            error_line = 'Unknown'
+            for line in tb_str.splitlines():
+                if 'File' in line and ', line ' in line:
+                    error_line = line.strip()
+                    break
+            print(f"Error loading {file_path}: {e}")
+            journal.record(dict(zip(LOG_COLUMNS, [
+                company_folder_name, file_name, 'Error', str(e), error_line, round(time.perf_counter() - started, 3)
+            ])))
+
+
+def main():
+    print("Starting XML to PostgreSQL load...")
+    os.makedirs(Log_Folder_Path, exist_ok=True)
+
+    lookup = taxonomy_lookup(load_master_mapping())
+    engine = create_engine(DATABASE_URI)
+    with engine.begin() as connection:
+        prepare_output_tables(connection, OUTPUT_TABLE_NAME)
+    missing_taxonomy_log = []
+    log_file_path = os.path.join(Log_Folder_Path, "xml_to_postgres_log.xlsx")
+    journal = RunJournal(log_file_path.replace(".xlsx", ".jsonl"))
+
+    for company_folder_path in sorted(Input_Folder_path.iterdir()):
+        if not company_folder_path.is_dir():
+            continue
+        folder_serial = company_folder_path.name.split('_')[0]
+        if not folder_serial.isdigit():
+            print(f"Skipping folder with invalid serial number format: {company_folder_path.name}")
+            continue
+        print(f"Processing folder: {company_folder_path}")
+        load_company_folder(engine, str(company_folder_path), lookup, missing_taxonomy_log, journal)
+
+    engine.dispose()
+
+    # Export the run journal and save the missing taxonomy log
+    journal.export_excel(log_file_path, LOG_COLUMNS)
+    journal.close()
+    if missing_taxonomy_log:
+        missing_file_path = os.path.join(Log_Folder_Path, "xml_to_postgres_missing_taxonomy.csv")
+        pd.DataFrame(missing_taxonomy_log).to_csv(missing_file_path, index=False)
+        print(f"Missing taxonomy log saved to: {missing_file_path}")
+    print('Process complete. Log file saved to:', log_file_path)
+
+
+if __name__ == "__main__":
+    main()